@@ -0,0 +1,144 @@
+"""
+Synthetic TaxCore invoice pages for benchmarks.
+
+Pages carry the same anchors and journal layout as the real verification
+pages, with any number of items, long wrapped names, Cyrillic and Latin text
+and either line ending.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Iterator, List, Tuple
+
+JOURNAL_WIDTH = 40
+
+WORDS = (
+    "Hleb",
+    "beli",
+    "Mleko",
+    "Jogurt",
+    "čokolada",
+    "Šećer",
+    "Хлеб",
+    "Млеко",
+    "Јогурт",
+    "чоколада",
+    "Шећер",
+    "кафа",
+    "500g",
+    "1l",
+    "ђумбир",
+    "Žvake",
+)
+LABELS = (("Ђ", 20), ("Е", 10), ("A", 0))
+
+PAGE_TEMPLATE = """<body class="body-content">
+  <div class="container">
+    <label class="h2" for="" id="invoiceStatusLabel">Рачун је проверен</label>
+    <span id="tinLabel">
+    {tin}
+    <span>
+    <span id="shopFullNameLabel">{shop}</span>
+    <span id="buyerIdLabel">
+    10:{buyer}
+    </span>
+    <span id="totalAmountLabel">
+    {total}
+    </span>
+    <span id="invoiceNumberLabel">
+    {invoice_number}
+    </span>
+    <span id="sdcDateTimeLabel">
+    07.04.2024. 17:00:30
+    </span>
+    <div id="collapse3" class="panel-collapse collapse">
+      <div class="panel-body">
+        <pre style="font-family:monospace">{journal}</pre>
+      </div>
+    </div>
+  </div>
+</body>"""
+
+JOURNAL_TEMPLATE = """============ ФИСКАЛНИ РАЧУН ============
+{tin}
+{shop}
+{shop}
+Кнеза Михаила
+Београд-Београд
+Касир:                         prodavac1
+ИД купца:                   10:{buyer}
+ЕСИР број:                      644/20.1
+-------------ПРОМЕТ ПРОДАЈА-------------
+Артикли
+========================================
+Назив   Цена         Кол.         Укупно
+{items}
+----------------------------------------
+Укупан износ:{total:>27}
+Платна картица:{total:>25}
+========================================
+Ознака       Име      Стопа        Порез
+Ђ           О-ПДВ   20,00%        500,00
+Е           О-ПДВ   10,00%        196,00
+A           О-ПДВ    0,00%          0,00
+----------------------------------------
+Укупан износ пореза:              696,00
+========================================
+ПФР време:          07.04.2024. 17:00:30
+ПФР број рачуна: {invoice_number}
+Бројач рачуна:           175097/188553ПП
+========================================<br/><img src=data:image/gif;base64 width='250' height='250'/>
+======== КРАЈ ФИСКАЛНОГ РАЧУНА ========="""
+
+
+def format_amount(para: int) -> str:
+    """Format an amount in para the way the journal prints it, e.g. 8.960,00"""
+
+    units, cents = divmod(para, 100)
+    return f"{units:,}".replace(",", ".") + f",{cents:02d}"
+
+
+def wrap(text: str) -> List[str]:
+    return [text[i : i + JOURNAL_WIDTH] for i in range(0, len(text), JOURNAL_WIDTH)]
+
+
+def generate_items(count: int, rng: random.Random) -> Tuple[List[str], int]:
+    lines = []
+    total = 0
+    for _ in range(count):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+        label, _ = rng.choice(LABELS)
+        price = rng.randint(1, 500000)
+        quantity = rng.randint(1, 9)
+        total += price * quantity
+        lines.extend(wrap(f"{name} ({label})"))
+        lines.append(
+            f"{format_amount(price):>12}{quantity:>11}{format_amount(price * quantity):>15}"
+        )
+    return lines, total
+
+
+def generate_page(items: int = 5, seed: int = 0, line_ending: str = "\n") -> bytes:
+    """Generate a page with `items` items"""
+
+    rng = random.Random(seed)
+    item_lines, total = generate_items(items, rng)
+    values = {
+        "tin": f"{rng.randint(100000000, 999999999)}",
+        "buyer": f"{rng.randint(100000000, 999999999)}",
+        "shop": rng.choice(("Primer naziva firme", "Пример назива фирме")),
+        "invoice_number": f"QWERTY1U-QWERTY1U-{seed + 1}",
+        "total": format_amount(total),
+    }
+    journal = JOURNAL_TEMPLATE.format(items="\n".join(item_lines), **values)
+    page = PAGE_TEMPLATE.format(journal=journal, **values)
+    return page.replace("\n", line_ending).encode("utf-8")
+
+
+def generate_corpus(count: int, items: int, seed: int = 0) -> Iterator[bytes]:
+    """Generate `count` pages alternating between line endings"""
+
+    for index in range(count):
+        line_ending = "\r\n" if index % 2 else "\n"
+        yield generate_page(items, seed=seed + index, line_ending=line_ending)
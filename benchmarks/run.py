@@ -0,0 +1,125 @@
+"""
+Offline benchmarks of the parser on synthetic invoices.
+
+Usage:
+
+    python -m benchmarks.run --sizes 5 50 500 --repeat 200 --json results.json
+
+Reports throughput and p50/p99 latency per step and invoice size, and the
+peak RSS of the process. `--json` writes the results for comparing versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, List
+
+from sr_invoice_parser import InvoiceParser, __version__
+
+from .corpus import generate_page
+
+FIELD_GETTERS = (
+    "get_company_name",
+    "get_company_tin",
+    "get_buyer_tin",
+    "get_total_amount",
+    "get_dt",
+    "get_invoice_number",
+    "get_invoice_text",
+    "get_items",
+)
+
+
+def peak_rss_kb() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "per_second": repeat / total if total else 0.0,
+        "p50_us": percentile(timings, 0.5) * 1e6,
+        "p99_us": percentile(timings, 0.99) * 1e6,
+    }
+
+
+def benchmark_size(items: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    page = generate_page(items)
+    parser = InvoiceParser(html_text=page)
+    invoice_text = parser.get_invoice_text()
+
+    results = {
+        "get_html_selector": measure(lambda: parser.get_html_selector(page), repeat)
+    }
+    for getter in FIELD_GETTERS:
+        method = getattr(parser, getter)
+        results[getter] = measure(method, repeat)
+    results["get_items(invoice_text)"] = measure(
+        lambda: parser.get_items(invoice_text), repeat
+    )
+    results["parse_journal(invoice_text)"] = measure(
+        lambda: parser.parse_journal(invoice_text), repeat
+    )
+    for engine in InvoiceParser.ENGINES:
+        results[f"data[{engine}]"] = measure(
+            lambda: InvoiceParser(html_text=page, engine=engine).data(), repeat
+        )
+    return results
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500])
+    arguments.add_argument("--repeat", type=int, default=200)
+    arguments.add_argument("--json", help="write the results to this file")
+    options = arguments.parse_args(argv)
+
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "sizes": {},
+    }
+    for items in options.sizes:
+        results = benchmark_size(items, options.repeat)
+        report["sizes"][str(items)] = results
+
+        print(f"\n{items} items")
+        print(f"{'step':<30}{'per second':>12}{'p50 us':>12}{'p99 us':>12}")
+        for step, result in results.items():
+            print(
+                f"{step:<30}{result['per_second']:>12.0f}"
+                f"{result['p50_us']:>12.1f}{result['p99_us']:>12.1f}"
+            )
+
+    report["peak_rss_kb"] = peak_rss_kb()
+    print(f"\npeak RSS: {report['peak_rss_kb']} kB")
+
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Startup benchmark of the package import, based on `python -X importtime`.
+
+Usage:
+
+    python -m benchmarks.startup --repeat 20 --max-ms 30 --json startup.json
+
+Runs the import statement in fresh interpreters and reports the median time
+spent importing the modules it pulled in, beyond what a bare interpreter
+imports at startup, the slowest of those modules and which heavy dependencies
+were loaded. `-X importtime` does not time modules loaded through
+`importlib.import_module`, as the lazy exports are, so the median wall time
+over a bare interpreter is reported as well. With `--max-ms` the exit status
+is 1 when the median wall time is above the budget, so the benchmark can
+guard against import time regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+from sr_invoice_parser import __version__
+
+STATEMENT = "import sr_invoice_parser"
+HEAVY_MODULES = ("requests", "parsel", "lxml", "pytz", "srtools")
+
+# (module, self microseconds, cumulative microseconds, nesting level)
+ImportRow = Tuple[str, int, int, int]
+
+
+def parse_importtime(output: str) -> List[ImportRow]:
+    """Parse the `-X importtime` lines written to stderr"""
+
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return rows
+
+
+def run_importtime(statement: str) -> Tuple[List[ImportRow], Set[str], float]:
+    """
+    Run the statement in a fresh interpreter.
+
+    Returns the timed imports, every module loaded in the end and the wall
+    time in microseconds.
+    """
+
+    # list the loaded modules too, lazily imported ones are not timed
+    code = f"{statement}\nimport sys\nprint(' '.join(sys.modules))"
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_us = (time.perf_counter() - start) * 1e6
+    return parse_importtime(process.stderr), set(process.stdout.split()), wall_us
+
+
+def measure_once(statement: str, baseline: Set[str]) -> Dict[str, object]:
+    """Import time and modules of one run, ignoring the interpreter startup"""
+
+    rows, loaded, wall_us = run_importtime(statement)
+    rows = [row for row in rows if row[0] not in baseline]
+    return {
+        "wall_us": wall_us,
+        "loaded": sorted(loaded - baseline),
+        "import_us": sum(cumulative for _, _, cumulative, level in rows if level == 0),
+        "modules": {name: self_us for name, self_us, _, _ in rows},
+    }
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arguments.add_argument("--statement", default=STATEMENT)
+    arguments.add_argument("--repeat", type=int, default=10)
+    arguments.add_argument("--top", type=int, default=10)
+    arguments.add_argument("--max-ms", type=float, help="fail above this median")
+    arguments.add_argument("--json", help="write the results to this file")
+    options = arguments.parse_args(argv)
+
+    rows, baseline, _ = run_importtime("pass")
+    baseline |= {name for name, _, _, _ in rows}
+    bare_us = statistics.median(
+        run_importtime("pass")[2] for _ in range(options.repeat)
+    )
+    runs = [measure_once(options.statement, baseline) for _ in range(options.repeat)]
+    import_ms = statistics.median(run["import_us"] for run in runs) / 1000
+    wall_ms = (statistics.median(run["wall_us"] for run in runs) - bare_us) / 1000
+    modules = runs[-1]["modules"]
+    loaded = runs[-1]["loaded"]
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+
+    print(f"{options.statement!r}, median of {options.repeat} runs:")
+    print(f"{wall_ms:.1f} ms wall time over a bare interpreter")
+    print(f"{import_ms:.1f} ms in imports timed by -X importtime")
+    print(f"{len(loaded)} modules imported, heavy dependencies: {heavy or 'none'}")
+    print(f"\n{'module':<40}{'self us':>10}")
+    for name, self_us in slowest[: options.top]:
+        print(f"{name:<40}{self_us:>10}")
+
+    if options.json:
+        report = {
+            "version": __version__,
+            "python": platform.python_version(),
+            "statement": options.statement,
+            "wall_ms": wall_ms,
+            "import_ms": import_ms,
+            "heavy_modules": heavy,
+            "loaded": loaded,
+            "self_us": modules,
+        }
+        with open(options.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if options.max_ms is not None and wall_ms > options.max_ms:
+        print(f"\nimport time is above the {options.max_ms} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
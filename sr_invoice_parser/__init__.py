@@ -8,7 +8,67 @@ __version__ = "1.0.1"
 
 VERSION = __version__
 
+from importlib import import_module  # noqa: E402
+from typing import TYPE_CHECKING  # noqa: E402
+
 from .exceptions import ParserParseException, ParserRequestException  # noqa: E402
-from .parser import InvoiceParser  # noqa: E402
 
-__all__ = ["InvoiceParser", "ParserRequestException", "ParserParseException"]
+if TYPE_CHECKING:
+    from .archive import ConcatenatedArchive, TarArchive, open_archive
+    from .batch import BatchResult, BatchStats, parse_many
+    from .fetcher import AsyncInvoiceFetcher, FetchResult, fetch_many
+    from .models import Invoice, InvoiceItem
+    from .parser import InvoiceParser
+    from .scheduler import ReverificationScheduler, StatusChange
+
+# the rest of the API is imported on first access, so `import sr_invoice_parser`
+# stays cheap for callers that only need a part of it
+_LAZY_EXPORTS = {
+    "AsyncInvoiceFetcher": "fetcher",
+    "BatchResult": "batch",
+    "BatchStats": "batch",
+    "ConcatenatedArchive": "archive",
+    "FetchResult": "fetcher",
+    "Invoice": "models",
+    "InvoiceItem": "models",
+    "InvoiceParser": "parser",
+    "ReverificationScheduler": "scheduler",
+    "StatusChange": "scheduler",
+    "TarArchive": "archive",
+    "fetch_many": "fetcher",
+    "open_archive": "archive",
+    "parse_many": "batch",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+__all__ = [
+    "InvoiceParser",
+    "ParserRequestException",
+    "ParserParseException",
+    "BatchResult",
+    "BatchStats",
+    "parse_many",
+    "AsyncInvoiceFetcher",
+    "FetchResult",
+    "fetch_many",
+    "Invoice",
+    "InvoiceItem",
+    "ConcatenatedArchive",
+    "TarArchive",
+    "open_archive",
+    "ReverificationScheduler",
+    "StatusChange",
+]
@@ -0,0 +1,76 @@
+"""
+Parsing of amounts in the Serbian locale format used by TaxCore, e.g. `8.960,00`.
+
+Dots group thousands and the comma separates decimals. Each parser does a
+single `str.translate` pass in C before the numeric conversion. Use
+`parse_para` or `parse_decimal` when sums have to be exact.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Union
+
+Amount = Union[float, Decimal, int]
+
+# drop the thousands separators and turn the decimal comma into a dot
+TO_DECIMAL_POINT = str.maketrans({".": None, ",": "."})
+# drop both separators, leaving only the digits
+TO_DIGITS = str.maketrans({".": None, ",": None})
+
+
+def parse_float(value: str) -> float:
+    """Parse `8.960,00` as `8960.0`"""
+
+    return float(value.translate(TO_DECIMAL_POINT))
+
+
+def parse_decimal(value: str) -> Decimal:
+    """Parse `8.960,00` as `Decimal("8960.00")`, keeping the scale"""
+
+    return Decimal(value.strip().translate(TO_DECIMAL_POINT))
+
+
+def parse_para(value: str) -> int:
+    """Parse `8.960,00` as `896000`, the amount in para (1/100 dinar)"""
+
+    value = value.strip()
+    comma = value.rfind(",")
+    decimals = 0 if comma == -1 else len(value) - comma - 1
+    if decimals > 2:
+        raise ValueError(f"Amount {value!r} has more than 2 decimals")
+    return int(value.translate(TO_DIGITS)) * 10 ** (2 - decimals)
+
+
+def parse_quantity(value: str, kind: str = "float") -> Union[int, float, Decimal]:
+    """
+    Parse a journal quantity: `1` as `1`, `0,456` as `0.456`.
+
+    Whole quantities stay integers. Fractional ones are floats, or `Decimal`
+    when `kind` is `"decimal"`.
+    """
+
+    if "," not in value:
+        return int(value.translate(TO_DIGITS))
+    if kind == "decimal":
+        return parse_decimal(value)
+    return parse_float(value)
+
+
+PARSERS: Dict[str, Callable[[str], Amount]] = {
+    "float": parse_float,
+    "decimal": parse_decimal,
+    "para": parse_para,
+}
+
+
+def parse_amount(value: str, kind: str = "float") -> Amount:
+    """Parse an amount as a `float`, `Decimal` or integer para"""
+
+    return PARSERS[kind](value)
+
+
+def parse_amounts(values: Iterable[str], kind: str = "float") -> List[Amount]:
+    """Parse a whole column of amounts, e.g. the item prices of an invoice"""
+
+    return list(map(PARSERS[kind], values))
@@ -0,0 +1,286 @@
+"""
+Readers for archived raw pages.
+
+`ConcatenatedArchive` reads WARC-like files of records concatenated one after
+another and `TarArchive` reads tar bundles, plain or compressed with gzip or
+zstd (requires `zstandard`). Both keep an index of `ArchiveEntry` offsets, so
+any page can be read on its own, and the index can be saved next to the
+archive to skip the scan when the archive is reopened.
+
+Concatenated files and plain tar files are memory-mapped and pages are
+returned as `memoryview` slices of the mapping, without copying. Compressed
+tar files are streamed: reading in order decompresses the archive once, and
+jumping back restarts the stream. Pages can be passed to `InvoiceParser` as
+they are.
+"""
+
+from __future__ import annotations
+
+import gzip
+import mmap
+import os
+import tarfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+Page = Union[bytes, memoryview]
+
+RECORD_HEADER_END = b"\r\n\r\n"
+RECORD_TYPES = (b"response", b"resource")
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """A page stored at `offset` with `length` bytes"""
+
+    name: str
+    offset: int
+    length: int
+
+
+def save_index(entries: List[ArchiveEntry], path: str) -> None:
+    """Write an archive index, one tab separated entry per line"""
+
+    with open(path, "w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(f"{entry.offset}\t{entry.length}\t{entry.name}\n")
+
+
+def load_index(path: str) -> List[ArchiveEntry]:
+    """Read an archive index written by `save_index`"""
+
+    entries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            offset, length, name = line.rstrip("\n").split("\t", 2)
+            entries.append(ArchiveEntry(name, int(offset), int(length)))
+    return entries
+
+
+class _Archive(ABC):
+    entries: List[ArchiveEntry]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: int) -> Page:
+        return self.read(self.entries[index])
+
+    def __iter__(self) -> Iterator[Tuple[str, Page]]:
+        for entry in self.entries:
+            yield entry.name, self.read(entry)
+
+    @abstractmethod
+    def read(self, entry: ArchiveEntry) -> Page:
+        """Read the page of one entry"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the file and any mapping"""
+
+    def save_index(self, path: str) -> None:
+        save_index(self.entries, path)
+
+
+class _MappedArchive(_Archive):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "rb")
+        if os.fstat(self.file.fileno()).st_size:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # empty files can not be mapped
+            self.mmap = b""
+        self.view = memoryview(self.mmap)
+
+    def read(self, entry: ArchiveEntry) -> memoryview:
+        return self.view[entry.offset : entry.offset + entry.length]
+
+    def close(self) -> None:
+        try:
+            self.view.release()
+            if isinstance(self.mmap, mmap.mmap):
+                self.mmap.close()
+        except BufferError:
+            # slices still in use keep the mapping alive until they are freed
+            pass
+        self.file.close()
+
+
+class ConcatenatedArchive(_MappedArchive):
+    """
+    Memory-mapped file of concatenated WARC-like records.
+
+    Each record is a block of header lines with a `Content-Length`, an empty
+    line and the payload. `response` and `resource` records are indexed,
+    using `WARC-Target-URI` as the name, and an HTTP status line and headers
+    at the start of a payload are skipped.
+    """
+
+    def __init__(self, path: str, index: Optional[str] = None) -> None:
+        super().__init__(path)
+        if index is not None:
+            self.entries = load_index(index)
+        else:
+            self.entries = list(self.scan())
+
+    def scan(self) -> Iterator[ArchiveEntry]:
+        """Scan the record headers, skipping over the payloads"""
+
+        data = self.mmap
+        position = 0
+        size = len(data)
+        number = 0
+        while position < size:
+            header_end = data.find(RECORD_HEADER_END, position)
+            if header_end == -1:
+                break
+            headers = {}
+            for line in data[position:header_end].split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                headers[name.strip().lower()] = value.strip()
+            start = header_end + len(RECORD_HEADER_END)
+            length = int(headers.get(b"content-length", b"0"))
+            end = start + length
+            position = end
+            # records are followed by an empty line
+            while data[position : position + 2] == b"\r\n":
+                position += 2
+
+            if headers.get(b"warc-type", b"resource") not in RECORD_TYPES:
+                continue
+            if data[start : start + 5] == b"HTTP/":
+                body = data.find(RECORD_HEADER_END, start, end)
+                if body != -1:
+                    start = body + len(RECORD_HEADER_END)
+            name = headers.get(b"warc-target-uri", b"").decode("utf-8", "replace")
+            yield ArchiveEntry(name or f"record-{number}", start, end - start)
+            number += 1
+
+
+def _compression(path: str) -> Optional[str]:
+    if path.endswith((".tar.gz", ".tgz")):
+        return "gzip"
+    if path.endswith((".tar.zst", ".tar.zstd", ".tzst")):
+        return "zstd"
+    return None
+
+
+class TarArchive(_Archive):
+    """
+    Tar bundle of pages, memory-mapped when plain and streamed when compressed.
+
+    The compression is taken from the file name: `.tar.gz`/`.tgz` or
+    `.tar.zst`/`.tzst`.
+    """
+
+    def __init__(self, path: str, index: Optional[str] = None) -> None:
+        self.path = path
+        self.compression = _compression(path)
+        self.stream: Optional[BinaryIO] = None
+        self.position = 0
+        if self.compression is None:
+            self._mapped: Optional[_MappedArchive] = _MappedArchive(path)
+        else:
+            self._mapped = None
+        self._entries = load_index(index) if index is not None else None
+
+    @property
+    def entries(self) -> List[ArchiveEntry]:
+        if self._entries is None:
+            self._entries = list(self.scan())
+        return self._entries
+
+    def open_stream(self) -> BinaryIO:
+        """Open the decompressed tar stream from its start"""
+
+        if self.compression == "gzip":
+            return gzip.open(self.path, "rb")
+        if self.compression == "zstd":
+            import zstandard
+
+            return zstandard.ZstdDecompressor().stream_reader(open(self.path, "rb"))
+        return open(self.path, "rb")
+
+    def scan(self) -> Iterator[ArchiveEntry]:
+        """Read the member headers in one pass over the tar stream"""
+
+        if self._mapped is not None:
+            # plain tar files are seekable, so the scan skips the page data
+            with tarfile.open(self.path, mode="r:") as bundle:
+                for member in bundle:
+                    if member.isfile():
+                        yield ArchiveEntry(member.name, member.offset_data, member.size)
+            return
+
+        with self.open_stream() as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as bundle:
+                for member in bundle:
+                    if member.isfile():
+                        yield ArchiveEntry(member.name, member.offset_data, member.size)
+
+    def read(self, entry: ArchiveEntry) -> Page:
+        if self._mapped is not None:
+            return self._mapped.read(entry)
+
+        if self.stream is None or entry.offset < self.position:
+            # compressed streams only move forward, restart to go back
+            if self.stream is not None:
+                self.stream.close()
+            self.stream = self.open_stream()
+            self.position = 0
+        skip = entry.offset - self.position
+        while skip:
+            skipped = len(self.stream.read(min(skip, 1 << 20)))
+            if not skipped:
+                raise EOFError(f"Archive ended before '{entry.name}'")
+            skip -= skipped
+        content = self.stream.read(entry.length)
+        self.position = entry.offset + len(content)
+        return content
+
+    def __iter__(self) -> Iterator[Tuple[str, Page]]:
+        if self._mapped is not None:
+            yield from super().__iter__()
+            return
+        if self._entries is not None:
+            # a single pass over the stream, entries are read in offset order
+            for entry in sorted(self._entries, key=lambda entry: entry.offset):
+                yield entry.name, self.read(entry)
+            return
+
+        # index the members while reading them, decompressing only once
+        entries = []
+        with self.open_stream() as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as bundle:
+                for member in bundle:
+                    if member.isfile():
+                        entries.append(
+                            ArchiveEntry(member.name, member.offset_data, member.size)
+                        )
+                        yield member.name, bundle.extractfile(member).read()
+        self._entries = entries
+
+    def close(self) -> None:
+        if self._mapped is not None:
+            self._mapped.close()
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+
+def open_archive(
+    path: str, index: Optional[str] = None
+) -> Union[ConcatenatedArchive, TarArchive]:
+    """Open a tar bundle by its file name, anything else as concatenated records"""
+
+    if path.endswith((".tar", ".tgz", ".tzst")) or ".tar." in path:
+        return TarArchive(path, index=index)
+    return ConcatenatedArchive(path, index=index)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .exceptions import ParserParseException
+from .parser import InvoiceParser
+
+HtmlContent = Union[str, bytes, memoryview]
+
+
+@dataclass
+class BatchResult:
+    """Result of parsing a single page in a batch"""
+
+    index: int
+    data: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    """Throughput statistics collected while a batch is running"""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def add(self, result: BatchResult) -> None:
+        self.total += 1
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+
+def _parse_chunk(chunk: List[Tuple[int, HtmlContent]]) -> List[BatchResult]:
+    results = []
+    for index, html_text in chunk:
+        try:
+            data = InvoiceParser(html_text=html_text).data()
+            results.append(BatchResult(index=index, data=data))
+        except ParserParseException as e:
+            results.append(BatchResult(index=index, error=str(e)))
+    return results
+
+
+def _chunks(
+    html_texts: Iterable[HtmlContent], chunksize: int
+) -> Iterator[List[Tuple[int, HtmlContent]]]:
+    iterator = enumerate(html_texts)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_many(
+    html_texts: Iterable[HtmlContent],
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+    ordered: bool = True,
+    stats: Optional[BatchStats] = None,
+) -> Iterator[BatchResult]:
+    """
+    Parse many HTML pages, spreading the work across a process pool.
+
+    Yields a `BatchResult` per page, in input order when `ordered` is true and
+    as soon as each chunk completes otherwise. Pages that fail with
+    `ParserParseException` are yielded as error records instead of aborting
+    the batch. With `workers=1` parsing runs in the current process.
+    Pass a `BatchStats` instance to collect throughput statistics.
+    """
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if stats is None:
+        stats = BatchStats()
+
+    chunks = _chunks(html_texts, chunksize)
+
+    if workers == 1:
+        for chunk in chunks:
+            for result in _parse_chunk(chunk):
+                stats.add(result)
+                yield result
+        stats.finished_at = time.perf_counter()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a bounded number of chunks in flight so memory does not grow
+        # with the size of the input
+        max_pending = workers * 2
+        pending: Deque[Future] = deque()
+
+        for chunk in chunks:
+            # archive slices are views of a mapping and have to be copied
+            # to reach the worker processes
+            chunk = [
+                (index, html_text.tobytes())
+                if isinstance(html_text, memoryview)
+                else (index, html_text)
+                for index, html_text in chunk
+            ]
+            pending.append(executor.submit(_parse_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from _drain(pending, ordered, stats)
+        while pending:
+            yield from _drain(pending, ordered, stats)
+
+    stats.finished_at = time.perf_counter()
+
+
+def _drain(
+    pending: Deque[Future], ordered: bool, stats: BatchStats
+) -> Iterator[BatchResult]:
+    if ordered:
+        done = [pending.popleft()]
+    else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+
+    for future in done:
+        for result in future.result():
+            stats.add(result)
+            yield result
@@ -0,0 +1,256 @@
+"""
+Response cache for fetched invoice pages.
+
+Pages are keyed by the `vl` parameter of the QR URL, so the same invoice maps
+to the same entry however the URL was written. `ResponseCache` puts an
+in-memory LRU in front of an optional filesystem backend and can also keep the
+parsed `data()` result next to the page.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .fast import scan_status
+from .models import dumps, loads_with_options
+from .qr import URL_SAFE_TO_STANDARD
+
+FINAL_STATUS = "Рачун је проверен".encode("utf-8")
+
+
+def cache_key(url: str) -> str:
+    """
+    Build the cache key from the normalized `vl` URL parameter.
+
+    `+` written as a space or `%2B`, the URL-safe base64 alphabet and the
+    padding do not change the key.
+    """
+
+    values = parse_qs(urlparse(url).query).get("vl")
+    if values:
+        token = values[0].translate(URL_SAFE_TO_STANDARD).strip().rstrip("=")
+    else:
+        token = url.strip()
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def is_final(content: bytes) -> bool:
+    """Whether the page shows a verified invoice, which never changes again"""
+
+    return scan_status(content) == FINAL_STATUS.decode("utf-8")
+
+
+@dataclass
+class CacheEntry:
+    content: bytes
+    data: Optional[dict] = None
+    final: bool = False
+    # the parser options `data` was made with
+    options: Optional[dict] = None
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+class MemoryCache:
+    """In-memory LRU cache bounded by the total size of the cached pages"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.delete(key)
+        if entry.size > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def delete(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+
+class FileSystemCache:
+    """
+    Filesystem cache storing one file per entry in sharded directories.
+
+    Each file holds a JSON line of metadata, a JSON line with the parsed
+    result, empty if there is none, and the raw page. `compression` can be
+    `None`, `"gzip"` or `"zstd"` (requires `zstandard`).
+    """
+
+    COMPRESSIONS = (None, "gzip", "zstd")
+
+    def __init__(self, directory: str, compression: Optional[str] = None) -> None:
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'")
+        # a file that is not an entry of this cache, e.g. written with another
+        # compression or format, or truncated
+        self._read_errors: tuple = (ValueError, KeyError, TypeError, OSError)
+        self._read_errors += (EOFError, zlib.error)
+        if compression == "zstd":
+            import zstandard
+
+            self._read_errors += (zstandard.ZstdError,)
+            self._zstd_compressor = zstandard.ZstdCompressor()
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+        self.directory = directory
+        self.compression = compression
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key[2:4], key)
+
+    def _compress(self, blob: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(blob)
+        if self.compression == "zstd":
+            return self._zstd_compressor.compress(blob)
+        return blob
+
+    def _decompress(self, blob: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.decompress(blob)
+        if self.compression == "zstd":
+            return self._zstd_decompressor.decompress(blob)
+        return blob
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self.path(key), "rb") as file:
+                blob = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            meta, data, content = self._decompress(blob).split(b"\n", 2)
+            meta = json.loads(meta)
+            entry = CacheEntry(
+                content=content, final=meta["final"], stored_at=meta["stored_at"]
+            )
+            if data:
+                entry.data, entry.options = loads_with_options(data)
+        except self._read_errors:
+            # written in another format, treated as missing
+            return None
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = json.dumps({"final": entry.final, "stored_at": entry.stored_at})
+        data = dumps(entry.data, entry.options) if entry.data is not None else ""
+        blob = self._compress(
+            b"\n".join((meta.encode(), data.encode("utf-8"), entry.content))
+        )
+        # write to a temporary file first so readers never see partial entries
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(blob)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+class ResponseCache:
+    """
+    Two-tier page cache: an in-memory LRU in front of an optional backend.
+
+    Entries older than `ttl` seconds are treated as missing, except pages of
+    verified invoices, which never change. With `store_data` the parsed
+    `data()` result is cached too, so a hit also skips parsing.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[FileSystemCache] = None,
+        memory: Optional[MemoryCache] = None,
+        ttl: Optional[float] = None,
+        store_data: bool = True,
+    ) -> None:
+        self.backend = backend
+        self.memory = memory if memory is not None else MemoryCache()
+        self.ttl = ttl
+        self.store_data = store_data
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        if entry.final or self.ttl is None:
+            return False
+        return time.time() - entry.stored_at > self.ttl
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        key = cache_key(url)
+        entry = self.memory.get(key)
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            self.delete(url)
+            return None
+        return entry
+
+    def _put(self, key: str, entry: CacheEntry) -> None:
+        self.memory.set(key, entry)
+        if self.backend is not None:
+            self.backend.set(key, entry)
+
+    def set(
+        self,
+        url: str,
+        content: bytes,
+        data: Optional[dict] = None,
+        options: Optional[dict] = None,
+    ) -> None:
+        store_data = self.store_data and data is not None
+        entry = CacheEntry(
+            content=content,
+            data=data if store_data else None,
+            final=is_final(content),
+            stored_at=time.time(),
+            options=options if store_data else None,
+        )
+        self._put(cache_key(url), entry)
+
+    def set_data(self, url: str, data: dict, options: Optional[dict] = None) -> None:
+        """Attach the parsed result, made with the parser `options`, to a page"""
+
+        if not self.store_data:
+            return
+        entry = self.get(url)
+        if entry is not None:
+            self._put(cache_key(url), replace(entry, data=data, options=options))
+
+    def delete(self, url: str) -> None:
+        key = cache_key(url)
+        self.memory.delete(key)
+        if self.backend is not None:
+            self.backend.delete(key)
@@ -0,0 +1,272 @@
+"""
+Command-line bulk ingestion.
+
+Reads invoice URLs or HTML file paths, one per line, from stdin or `--input`,
+or HTML files matching `--glob`. Sources are fetched and parsed concurrently
+and one JSON line per invoice is written to stdout as soon as it finishes.
+
+With `--resume CHECKPOINT` the number of leading sources that are fully done
+is kept in the checkpoint file, and a restarted run skips them. Sources that
+finished out of order after that point are processed again on restart. Files
+matching `--glob` are taken in a stable order, each directory sorted by name
+and walked depth first, so the position stays valid across runs as long as
+no files are added before it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import glob
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, TextIO
+
+from .exceptions import ParserParseException, ParserRequestException
+from .lazy import LazyModule
+from .models import dumps
+from .parser import InvoiceParser
+
+requests = LazyModule("requests")
+
+URL_PREFIXES = ("http://", "https://")
+# connect and read timeouts, so a stalled connection cannot block a worker
+TIMEOUT = (5.0, 15.0)
+RETRIES = 3
+BACKOFF = 0.5
+
+
+class Checkpoint:
+    """Tracks how many leading sources are done, using constant memory"""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self.position = 0
+        self.done: Set[int] = set()
+        if path and os.path.exists(path):
+            with open(path) as file:
+                self.position = int(file.read().strip() or 0)
+
+    def complete(self, index: int) -> None:
+        self.done.add(index)
+        advanced = False
+        while self.position in self.done:
+            self.done.remove(self.position)
+            self.position += 1
+            advanced = True
+        if advanced and self.path:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as file:
+                file.write(str(self.position))
+            os.replace(tmp_path, self.path)
+
+
+def iter_glob(pattern: str) -> Iterator[str]:
+    """
+    Yield paths matching a glob pattern in a stable order.
+
+    Filesystem order is arbitrary, so each directory is listed sorted and
+    walked depth first. Only the listings on the current path are held in
+    memory, never the full set of matches.
+    """
+
+    parts = pattern.split(os.sep)
+    if os.path.isabs(pattern):
+        return _walk_glob(os.sep, parts[1:])
+    return _walk_glob("", parts)
+
+
+def _walk_glob(base: str, parts: List[str]) -> Iterator[str]:
+    if not parts:
+        if base:
+            yield base
+        return
+    part, rest = parts[0], parts[1:]
+    if not glob.has_magic(part):
+        path = os.path.join(base, part)
+        exists = os.path.isdir(path) if rest else os.path.lexists(path)
+        if exists:
+            yield from _walk_glob(path, rest)
+        return
+
+    try:
+        with os.scandir(base or os.curdir) as entries:
+            # hidden entries are only matched explicitly, like glob does
+            listing = sorted(
+                (entry.name, entry.is_dir())
+                for entry in entries
+                if not entry.name.startswith(".") or part.startswith(".")
+            )
+    except OSError:
+        return
+    if part == "**":
+        # zero or more directories
+        yield from _walk_glob(base, rest)
+        for name, is_dir in listing:
+            if is_dir:
+                yield from _walk_glob(os.path.join(base, name), parts)
+        return
+    for name, is_dir in listing:
+        if fnmatch.fnmatch(name, part) and (is_dir or not rest):
+            yield from _walk_glob(os.path.join(base, name), rest)
+
+
+def iter_sources(options: argparse.Namespace) -> Iterator[str]:
+    for pattern in options.glob or ():
+        yield from iter_glob(pattern)
+    if options.glob and options.input is None:
+        return
+
+    if options.input in (None, "-"):
+        lines: TextIO = sys.stdin
+    else:
+        lines = open(options.input)
+    with lines:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def build_session(workers: int) -> requests.Session:
+    """
+    Build the pooled session shared by the workers.
+
+    Connection errors and 5xx responses are retried with exponential backoff.
+    """
+
+    retry = requests.adapters.Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=workers, pool_maxsize=workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch(session: requests.Session, url: str) -> bytes:
+    try:
+        response = session.get(url, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        raise ParserRequestException(f"Request failed: {e}")
+    if response.status_code != 200:
+        raise ParserRequestException(
+            f"Request failed with status code {response.status_code}"
+        )
+    return response.content
+
+
+def process(
+    source: str, options: argparse.Namespace, session: requests.Session
+) -> dict:
+    parser_options = {
+        "engine": options.engine,
+        "journal_format": options.journal_format,
+    }
+    try:
+        if source.startswith(URL_PREFIXES):
+            parser = InvoiceParser(url=source, lazy=True, **parser_options)
+            if options.source == "page":
+                parser.validate_url()
+                parser = InvoiceParser.from_response(
+                    fetch(session, source), url=source, **parser_options
+                )
+        else:
+            with open(source, "rb") as file:
+                parser = InvoiceParser(html_text=file.read(), **parser_options)
+        data = parser.data(fields=options.fields, source=options.source)
+    except (ParserParseException, ParserRequestException, OSError) as e:
+        return {"source": source, "error": str(e)}
+    return {"source": source, **data}
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    arguments = argparse.ArgumentParser(
+        prog="sr-invoice-parser",
+        description=__doc__.strip().splitlines()[0],
+    )
+    arguments.add_argument(
+        "-i", "--input", help="file with one URL or path per line, '-' for stdin"
+    )
+    arguments.add_argument(
+        "-g", "--glob", action="append", help="parse HTML files matching the pattern"
+    )
+    arguments.add_argument(
+        "-w", "--workers", type=int, default=8, help="number of concurrent workers"
+    )
+    arguments.add_argument(
+        "--engine", choices=InvoiceParser.ENGINES, default="dom", help="parser engine"
+    )
+    arguments.add_argument(
+        "--source",
+        choices=InvoiceParser.SOURCES,
+        default="page",
+        help="read the fields from the fetched page or decode them from the QR URL",
+    )
+    arguments.add_argument(
+        "--journal-format",
+        choices=InvoiceParser.JOURNAL_FORMATS,
+        default="html",
+        help="output the journal as HTML or as plain text without the QR image",
+    )
+    arguments.add_argument(
+        "--fields",
+        type=lambda value: value.split(","),
+        help="comma separated fields to output, all by default",
+    )
+    arguments.add_argument(
+        "--resume", metavar="CHECKPOINT", help="checkpoint file to resume from"
+    )
+    return arguments
+
+
+def main(argv=None) -> int:
+    options = build_argument_parser().parse_args(argv)
+    unknown = set(options.fields or ()) - set(InvoiceParser.FIELDS)
+    if unknown:
+        print(f"Unknown fields: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    checkpoint = Checkpoint(options.resume)
+    # bound the number of sources in flight so memory does not grow with input
+    max_pending = options.workers * 4
+    failed = 0
+
+    def emit(done: Set[Future], pending: Dict[Future, int]) -> None:
+        nonlocal failed
+        for future in done:
+            index = pending.pop(future)
+            result = future.result()
+            failed += "error" in result
+            sys.stdout.write(dumps(result) + "\n")
+            sys.stdout.flush()
+            checkpoint.complete(index)
+
+    session = build_session(options.workers)
+    with session, ThreadPoolExecutor(max_workers=options.workers) as executor:
+        pending: Dict[Future, int] = {}
+        for index, source in enumerate(iter_sources(options)):
+            if index < checkpoint.position:
+                continue
+            pending[executor.submit(process, source, options, session)] = index
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                emit(done, pending)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            emit(done, pending)
+
+    if failed:
+        print(f"{failed} invoice(s) failed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Conversion of TaxCore PFR times, printed in Belgrade local time, to UTC.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List
+
+from .lazy import LazyModule
+
+pytz = LazyModule("pytz")
+
+DATETIME_FORMAT = "%d.%m.%Y. %H:%M:%S"
+DATETIME_PATTERN = re.compile(
+    r"\s*(\d{2})\.(\d{2})\.(\d{4})\.\s+(\d{2}):(\d{2}):(\d{2})\s*$"
+)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=None)
+def belgrade_tz():
+    """The Europe/Belgrade timezone, loaded on first use"""
+
+    return pytz.timezone("Europe/Belgrade")
+
+
+def to_utc(value: str, datetime_format: str = DATETIME_FORMAT) -> datetime:
+    """Convert a Belgrade local time string to an aware UTC datetime"""
+
+    dt = datetime.strptime(value, datetime_format)
+    return belgrade_tz().localize(dt).astimezone(pytz.utc)
+
+
+@lru_cache(maxsize=None)
+def _utc_offset(year: int, month: int, day: int, hour: int) -> int:
+    # DST transitions in Belgrade happen on the hour, so one lookup per local
+    # hour builds the transition table lazily
+    dt = belgrade_tz().localize(datetime(year, month, day, hour))
+    return int(dt.utcoffset().total_seconds())
+
+
+@lru_cache(maxsize=4096)
+def _epoch_days(year: int, month: int, day: int) -> int:
+    return date(year, month, day).toordinal() - EPOCH_ORDINAL
+
+
+def to_utc_epochs(values: Iterable[str], as_numpy: bool = False):
+    """
+    Convert many Belgrade local time strings to UTC epoch seconds at once.
+
+    Returns a list of ints, or a NumPy `datetime64[s]` array with
+    `as_numpy=True` (requires `numpy`). Results match `to_utc()`.
+    """
+
+    epochs: List[int] = []
+    append = epochs.append
+    for value in values:
+        match = DATETIME_PATTERN.match(value)
+        if match is None:
+            raise ValueError(
+                f"time data {value!r} does not match format {DATETIME_FORMAT!r}"
+            )
+        day, month, year, hour, minute, second = map(int, match.groups())
+        append(
+            _epoch_days(year, month, day) * 86400
+            + hour * 3600
+            + minute * 60
+            + second
+            - _utc_offset(year, month, day, hour)
+        )
+
+    if as_numpy:
+        import numpy
+
+        return numpy.array(epochs, dtype="datetime64[s]")
+    return epochs
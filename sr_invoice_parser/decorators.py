@@ -1,18 +1,31 @@
 import functools
+import time
 
-from .exceptions import ParserParseException
+from .exceptions import ParserParseException, ParserRequestException
 
 
 def handle_exception():
     def wrapper(function):
         @functools.wraps(function)
         def inner(*args, **kwargs):
+            metrics = getattr(args[0], "metrics", None) if args else None
+            if metrics is not None:
+                start = time.perf_counter()
+            ok = False
             try:
-                return function(*args, **kwargs)
+                result = function(*args, **kwargs)
+                ok = True
+                return result
+            except ParserRequestException:
+                # lazy parsers fetch on first field access, keep request errors
+                raise
             except Exception as e:
                 raise ParserParseException(
                     f"Failed to parse the HTML content in '{function.__name__}': {e}"
                 )
+            finally:
+                if metrics is not None:
+                    metrics.observe(function.__name__, time.perf_counter() - start, ok)
 
         return inner
 
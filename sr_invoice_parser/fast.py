@@ -0,0 +1,160 @@
+"""
+Fast-path extraction of the invoice anchors without building the page DOM.
+
+The scanner walks the raw page once with a precompiled pattern and picks up the
+label spans and the journal `<pre>` by their ids. Only the small journal
+fragment is handed to lxml, so its serialization matches the DOM path exactly.
+Anchors that are missing, repeated or not plain text are left out of the
+result, and `InvoiceParser` falls back to the DOM for them.
+"""
+
+from __future__ import annotations
+
+import re
+from html import unescape
+from typing import Dict, Iterable, Optional, Union
+
+from .exceptions import ParserRequestException
+from .lazy import LazyModule
+
+parsel = LazyModule("parsel")
+
+SPAN_IDS = (
+    "shopFullNameLabel",
+    "tinLabel",
+    "buyerIdLabel",
+    "totalAmountLabel",
+    "sdcDateTimeLabel",
+    "invoiceNumberLabel",
+)
+JOURNAL_ID = "collapse3"
+STATUS_ID = "invoiceStatusLabel"
+
+_ID_VALUE = rb"""\sid\s*=\s*["']?(%s)(?=["'\s/>])"""
+ANCHOR_PATTERN = re.compile(
+    rb"<(?:span\b[^>]*?"
+    + _ID_VALUE % "|".join(SPAN_IDS).encode()
+    + rb"[^>]*>([^<]*)|div\b[^>]*?"
+    + _ID_VALUE % JOURNAL_ID.encode()
+    + rb")"
+)
+STATUS_PATTERN = re.compile(
+    rb"<(?:label|span)\b[^>]*?" + _ID_VALUE % STATUS_ID.encode() + rb"[^>]*>([^<]*)"
+)
+PRE_START_PATTERN = re.compile(rb"<pre\b", re.IGNORECASE)
+PRE_END_PATTERN = re.compile(rb"</pre\s*>", re.IGNORECASE)
+JOURNAL_DIV_PATTERN = re.compile(rb"<div\b[^>]*?" + _ID_VALUE % JOURNAL_ID.encode())
+# how far back a match is searched again when more of the page arrives, so
+# tags split between chunks are still found
+LOOKBEHIND = 1024
+
+
+def _decode(value: bytes) -> str:
+    text = str(value, "utf-8", errors="replace")
+    if "&" in text:
+        text = unescape(text)
+    if "\r" in text:
+        # libxml2 normalizes line endings while parsing
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _journal(body: bytes, start: int) -> Union[str, None]:
+    pre_start = PRE_START_PATTERN.search(body, start)
+    if pre_start is None:
+        return None
+    pre_end = PRE_END_PATTERN.search(body, pre_start.end())
+    if pre_end is None:
+        return None
+    fragment = bytes(body[pre_start.start() : pre_end.end()])
+    return parsel.Selector(body=fragment).css("pre").get()
+
+
+def scan_anchors(html_text: Union[str, bytes, memoryview]) -> Dict[str, str]:
+    """
+    Scan the page once and return the raw text of every anchor found.
+
+    Keys are the span ids from `SPAN_IDS` plus `JOURNAL_ID` for the journal
+    `<pre>` markup. Ambiguous or missing anchors are omitted.
+    """
+
+    if isinstance(html_text, str):
+        body = html_text.encode("utf-8")
+    else:
+        # bytes-like pages, e.g. archive slices, are scanned in place
+        body = html_text
+
+    found: Dict[str, bytes] = {}
+    journal_at = None
+    seen = set()
+    for match in ANCHOR_PATTERN.finditer(body):
+        span_id, text, div_id = match.groups()
+        anchor = (span_id or div_id).decode()
+        if anchor in seen:
+            found.pop(anchor, None)
+            journal_at = None if anchor == JOURNAL_ID else journal_at
+            continue
+        seen.add(anchor)
+        if div_id is not None:
+            journal_at = match.end()
+        elif text.strip():
+            found[anchor] = text
+
+    values = {anchor: _decode(text) for anchor, text in found.items()}
+    if journal_at is not None:
+        journal = _journal(body, journal_at)
+        if journal is not None:
+            values[JOURNAL_ID] = journal
+    return values
+
+
+def scan_status(html_text: Union[str, bytes, memoryview]) -> Optional[str]:
+    """The text of the status label, `None` if it is missing or repeated"""
+
+    if isinstance(html_text, str):
+        html_text = html_text.encode("utf-8")
+    matches = STATUS_PATTERN.findall(html_text)
+    if len(matches) != 1:
+        return None
+    return _decode(matches[0][1]).strip()
+
+
+def read_page(
+    chunks: Iterable[bytes], max_bytes: Optional[int] = None, stop_early: bool = True
+) -> bytes:
+    """
+    Read a page from a stream of chunks, stopping once everything parsed is in.
+
+    With `stop_early` reading stops after the `</pre>` of the journal when
+    every span in `SPAN_IDS` was seen before it, so the rest of the page is
+    never downloaded. More than `max_bytes` raises `ParserRequestException`.
+    """
+
+    body = bytearray()
+    journal_at = None
+    for chunk in chunks:
+        searched = max(0, len(body) - LOOKBEHIND)
+        body += chunk
+        if max_bytes is not None and len(body) > max_bytes:
+            raise ParserRequestException(f"Response is larger than {max_bytes} bytes")
+        if not stop_early:
+            continue
+
+        if journal_at is None:
+            match = JOURNAL_DIV_PATTERN.search(body, searched)
+            if match is None:
+                continue
+            journal_at = match.end()
+        pre_end = PRE_END_PATTERN.search(body, max(searched, journal_at))
+        if pre_end is None:
+            continue
+        seen = {
+            match.group(1).decode()
+            for match in ANCHOR_PATTERN.finditer(body, 0, journal_at)
+            if match.group(1) is not None
+        }
+        if seen.issuperset(SPAN_IDS):
+            return bytes(body[: pre_end.end()])
+        # some labels come after the journal, read the whole page
+        stop_early = False
+    return bytes(body)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from .exceptions import ParserRequestException
+from .lazy import LazyModule
+from .metrics import Metrics
+from .parser import InvoiceParser
+
+requests = LazyModule("requests")
+
+
+@dataclass
+class FetchResult:
+    """Result of fetching a single invoice page"""
+
+    url: str
+    content: Optional[bytes] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncInvoiceFetcher:
+    """
+    Fetch invoice pages concurrently from asyncio code.
+
+    Requests go through one pooled keep-alive session, so repeated requests to
+    the same host reuse their connections. Concurrency is capped per host,
+    every request has a connect and read timeout, and 5xx responses, timeouts
+    and dropped connections are retried with jittered exponential backoff.
+    Other request errors are raised as `ParserRequestException`.
+    """
+
+    ALLOWED_DOMAINS = InvoiceParser.ALLOWED_DOMAINS
+
+    def __init__(
+        self,
+        limit_per_host: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        allowed_domains: Optional[Sequence[str]] = None,
+        session: Optional[requests.Session] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.limit_per_host = limit_per_host
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.allowed_domains = list(allowed_domains or self.ALLOWED_DOMAINS)
+        self.metrics = metrics
+
+        # a session passed in belongs to the caller and is left open
+        self.owns_session = session is None
+        self.session = session or requests.Session()
+        if self.owns_session:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=limit_per_host, pool_maxsize=limit_per_host
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.limit_per_host)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=limit_per_host)
+
+    async def __aenter__(self) -> AsyncInvoiceFetcher:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        if self.owns_session:
+            self.session.close()
+
+    def validate_url(self, url: str) -> None:
+        """Validate the URL to ensure it's from an allowed domain"""
+        parsed_url = urlparse(url)
+
+        if parsed_url.netloc not in self.allowed_domains:
+            raise ParserRequestException("Invalid domain")
+
+    def _get(self, url: str) -> requests.Response:
+        return self.session.get(url, timeout=self.timeout)
+
+    async def fetch(self, url: str) -> bytes:
+        """Fetch the HTML content from the URL"""
+
+        self.validate_url(url)
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores[urlparse(url).netloc]
+
+        attempt = 0
+        while True:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await loop.run_in_executor(
+                        self._executor, self._get, url
+                    )
+                    error = None
+                except requests.RequestException as e:
+                    response = None
+                    error = f"Request failed: {e}"
+                    # timeouts and dropped connections are worth another try,
+                    # redirect loops or invalid URLs are not
+                    transient = isinstance(
+                        e,
+                        (
+                            requests.Timeout,
+                            requests.ConnectionError,
+                            requests.exceptions.ChunkedEncodingError,
+                        ),
+                    )
+
+            if self.metrics is not None:
+                ok = response is not None and response.status_code == 200
+                self.metrics.observe("fetch", time.perf_counter() - start, ok)
+                status = "error" if response is None else response.status_code
+                self.metrics.increment("fetch_responses", status=status)
+
+            if response is None and not transient:
+                raise ParserRequestException(error)
+            if response is not None:
+                if response.status_code == 200:
+                    return response.content
+                error = f"Request failed with status code {response.status_code}"
+                if response.status_code < 500:
+                    raise ParserRequestException(error)
+
+            if attempt >= self.retries:
+                raise ParserRequestException(error)
+
+            # full jitter keeps retries from many invoices from bunching up
+            await asyncio.sleep(random.uniform(0, self.backoff * 2**attempt))
+            attempt += 1
+            if self.metrics is not None:
+                self.metrics.increment("fetch_retries")
+
+    async def fetch_result(self, url: str) -> FetchResult:
+        try:
+            content = await self.fetch(url)
+        except ParserRequestException as e:
+            return FetchResult(url=url, error=str(e))
+        return FetchResult(url=url, content=content)
+
+    async def fetch_many(self, urls: Iterable[str]) -> List[FetchResult]:
+        """Fetch all URLs concurrently, returning results in input order"""
+
+        return await asyncio.gather(*(self.fetch_result(url) for url in urls))
+
+
+async def fetch_many(urls: Iterable[str], **kwargs) -> List[FetchResult]:
+    """Fetch all URLs with a short-lived `AsyncInvoiceFetcher`"""
+
+    async with AsyncInvoiceFetcher(**kwargs) as fetcher:
+        return await fetcher.fetch_many(urls)
@@ -0,0 +1,386 @@
+"""
+Single-pass tokenizer for the fiscal journal printed in the `<pre>` block.
+
+Item rows in the journal are a name, possibly wrapped over several lines,
+followed by a line with the unit price, quantity and total price. Names end
+with the label of their VAT rate, e.g. `(Ђ)`, which is looked up in the tax
+table printed after the payments.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import re
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from html import unescape
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .amounts import Amount, parse_float
+from .exceptions import ParserParseException
+from .lazy import LazyModule
+
+srtools = LazyModule("srtools")
+
+SECTION_SEPARATOR = "=" * 40
+LINE_SEPARATOR = "-" * 40
+ITEMS_TITLE = "Артикли"
+ITEMS_HEADER = "Укупно"
+
+AMOUNT = r"-?\d[\d.]*(?:,\d+)?"
+# quantities of weighed goods are fractional and may carry a unit, e.g. 0,456 kg
+QUANTITY = rf"{AMOUNT}(?:\s?[^\W\d_]+\.?)?"
+PRICE_LINE_PATTERN = re.compile(
+    rf"\s*(?P<price>{AMOUNT})\s+(?P<quantity>{QUANTITY})\s+(?P<total_price>{AMOUNT})(?!\S)"
+)
+UNIT_PATTERN = re.compile(r"\s?[^\W\d_]+\.?$")
+SPACES_PATTERN = re.compile(" {2,}")
+
+ItemRow = Tuple[str, Optional[str], Optional[str], Optional[str]]
+VatRate = Union[int, float]
+
+# rates of the standard labels, used when the journal has no tax table
+DEFAULT_VAT_RATES: Dict[str, VatRate] = {"a": 0, "e": 10, "g": 0, "đ": 20}
+UNKNOWN_VAT_RATE = 20
+# product names repeat a lot across invoices from the same shop
+NAME_CACHE_SIZE = 4096
+
+
+def items_section(invoice_text: str) -> str:
+    """Get the journal lines between the item table header and its end"""
+
+    start = invoice_text.find(SECTION_SEPARATOR)
+    if start != -1:
+        start += len(SECTION_SEPARATOR)
+        end = len(invoice_text)
+        for separator in (SECTION_SEPARATOR, LINE_SEPARATOR):
+            position = invoice_text.find(separator, start, end)
+            if position != -1:
+                end = position
+        header = invoice_text.find(ITEMS_HEADER, start, end)
+        if header != -1:
+            return invoice_text[header + len(ITEMS_HEADER) : end].strip()
+
+    raise ParserParseException("Items section not found in the journal")
+
+
+def iter_item_rows(invoice_text: str) -> Iterator[ItemRow]:
+    """
+    Yield `(name, price, quantity, total_price)` for every journal item.
+
+    Values are the raw journal strings. A name at the end of the section
+    without a price line is yielded with `None` values.
+    """
+
+    return iter_item_lines(items_section(invoice_text).splitlines())
+
+
+def iter_item_lines(lines: Iterable[str]) -> Iterator[ItemRow]:
+    """Yield the item rows found in the lines of the journal item table"""
+
+    name = None
+    for line in lines:
+        if not line:
+            continue
+        if "  " in line:
+            line = SPACES_PATTERN.sub(" ", line)
+
+        if name is None:
+            name = line
+            continue
+
+        match = PRICE_LINE_PATTERN.match(line)
+        if match is None:
+            # row is part of the item name, append it to the name
+            name += line
+            continue
+
+        yield name, match["price"], match["quantity"], match["total_price"]
+        name = None
+
+    if name is not None:
+        yield name, None, None, None
+
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+LABELED_LINE_PATTERN = re.compile(r"(?P<label>[^:]+):\s*(?P<value>.*)")
+
+TAX_TABLE_HEADER = "Ознака"
+TOTAL_AMOUNT_LABEL = "Укупан износ"
+TOTAL_TAX_LABEL = "Укупан износ пореза"
+HEADER_LABELS = {
+    "Касир": "cashier",
+    "ИД купца": "buyer_id",
+    "ЕСИР број": "esir_number",
+    "ЕСИР време": "esir_time",
+}
+FOOTER_LABELS = {
+    "ПФР време": "pfr_time",
+    "ПФР број рачуна": "invoice_number",
+    "Бројач рачуна": "invoice_counter",
+}
+
+# the QR code at the end of the journal is inlined as a base64 data URI, on
+# its own line after a line break
+QR_IMAGE_PATTERN = re.compile(
+    r"(?:<br\s*/?>)?<img\b[^>]*?\bsrc=[\"']?data:(?P<media_type>[^;,\s\"'>]+)"
+    r"(?:;base64)?,?(?P<data>[^\s\"'>]*)[^>]*>",
+    re.IGNORECASE,
+)
+BREAK_PATTERN = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+@dataclass
+class JournalImage:
+    """An image inlined in the journal, decoded on first access to `data`"""
+
+    media_type: str
+    encoded: str
+
+    @cached_property
+    def data(self) -> bytes:
+        try:
+            return base64.b64decode(self.encoded, validate=True)
+        except binascii.Error as e:
+            raise ParserParseException(f"Invalid journal image: {e}")
+
+
+def find_qr_image(invoice_text: str) -> Optional[JournalImage]:
+    """The QR code image of the journal HTML, `None` if it has none"""
+
+    match = QR_IMAGE_PATTERN.search(invoice_text)
+    if match is None or not match["data"]:
+        return None
+    return JournalImage(match["media_type"], match["data"])
+
+
+def journal_text(invoice_text: str, qr_reference: str = "") -> str:
+    """
+    The journal as plain text, without markup and without the QR image.
+
+    A non-empty `qr_reference` is put on its own line in place of the image.
+    """
+
+    qr_line = f"\n{qr_reference}" if qr_reference else ""
+    text = QR_IMAGE_PATTERN.sub(qr_line, invoice_text)
+    text = TAG_PATTERN.sub("", BREAK_PATTERN.sub("\n", text))
+    return unescape(text).strip()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def split_item_name(item_string: str) -> Tuple[str, Optional[str]]:
+    """
+    Transliterate an item name to Latin and split off its VAT label.
+
+    `"Хлеб (Ђ)"` gives `("Hleb", "đ")`, a name without a label gives `None`.
+    """
+
+    name = item_string.translate(srtools.CYR_TO_LAT_TTABLE).strip()
+    if len(name) >= 3 and name[-3] == "(":
+        return name[:-3].strip(), name[-2].lower()
+    return name, None
+
+
+def vat_label_key(label: str) -> str:
+    """Normalize a tax table label, Cyrillic or Latin, to the item label form"""
+
+    return label.translate(srtools.CYR_TO_LAT_TTABLE).lower()
+
+
+def vat_rate(rate: float) -> VatRate:
+    """Keep whole rates such as `20,00%` as integers"""
+
+    return int(rate) if rate.is_integer() else rate
+
+
+def vat_rates(invoice_text: str) -> Dict[str, VatRate]:
+    """Get the VAT rate of each label from the tax table of the journal"""
+
+    rates = dict(DEFAULT_VAT_RATES)
+    start = invoice_text.find(TAX_TABLE_HEADER)
+    if start == -1:
+        return rates
+    end = invoice_text.find(LINE_SEPARATOR, start)
+    if end == -1:
+        end = len(invoice_text)
+    # the first line is the table header
+    for line in invoice_text[start:end].splitlines()[1:]:
+        if "<" in line:
+            line = TAG_PATTERN.sub("", line)
+        parts = line.split()
+        if len(parts) >= 3:
+            rates[vat_label_key(parts[0])] = vat_rate(
+                parse_float(parts[-2].rstrip("%"))
+            )
+    return rates
+
+
+@dataclass
+class JournalHeader:
+    tin: Optional[str] = None
+    lines: List[str] = field(default_factory=list)
+    cashier: Optional[str] = None
+    buyer_id: Optional[str] = None
+    esir_number: Optional[str] = None
+    esir_time: Optional[str] = None
+    transaction_type: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Payment:
+    method: str
+    amount: Amount
+
+
+@dataclass
+class TaxRow:
+    label: str
+    name: str
+    rate: float
+    amount: Amount
+
+
+@dataclass
+class JournalFooter:
+    pfr_time: Optional[str] = None
+    invoice_number: Optional[str] = None
+    invoice_counter: Optional[str] = None
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Journal:
+    header: JournalHeader
+    items: list
+    total_amount: Optional[Amount]
+    payments: List[Payment]
+    taxes: List[TaxRow]
+    total_tax: Optional[Amount]
+    footer: JournalFooter
+
+
+def _labeled(line: str) -> Tuple[Optional[str], str]:
+    match = LABELED_LINE_PATTERN.match(line)
+    if match is None:
+        return None, line.strip()
+    return match["label"].strip(), match["value"].strip()
+
+
+def parse_journal(
+    invoice_text: str,
+    build_item: Callable[..., dict],
+    to_amount: Callable[[str], Amount],
+) -> Journal:
+    """
+    Parse every section of the journal in a single pass over its lines.
+
+    `build_item` turns an item row from `iter_item_lines` and the VAT rates
+    of the tax table into an item and `to_amount` converts journal amounts,
+    so results match `get_items`.
+    """
+
+    header = JournalHeader()
+    footer = JournalFooter()
+    item_lines: List[str] = []
+    payments: List[Payment] = []
+    taxes: List[TaxRow] = []
+    total_amount = None
+    total_tax = None
+
+    section = "title"
+    last_footer_field = None
+    for line in invoice_text.splitlines():
+        if "<" in line:
+            line = TAG_PATTERN.sub("", line)
+        stripped = line.strip()
+
+        if stripped == SECTION_SEPARATOR:
+            section = {
+                "title": "items",
+                "header": "items",
+                "payments": "after_payments",
+                "tax_total": "footer",
+            }.get(section, "end")
+            continue
+        if stripped == LINE_SEPARATOR:
+            section = {"items": "payments", "taxes": "tax_total"}.get(section, section)
+            continue
+        if not stripped:
+            continue
+
+        if section == "title":
+            section = "header"
+        elif section == "header":
+            label, value = _labeled(stripped)
+            if label is not None:
+                header.fields[label] = value
+                if label in HEADER_LABELS:
+                    setattr(header, HEADER_LABELS[label], value)
+            elif stripped.startswith("-"):
+                header.transaction_type = stripped.strip("- ")
+            elif stripped == ITEMS_TITLE:
+                continue
+            elif header.tin is None:
+                header.tin = stripped
+            else:
+                header.lines.append(stripped)
+        elif section == "items":
+            item_lines.append(line)
+        elif section == "payments":
+            label, value = _labeled(stripped)
+            if label == TOTAL_AMOUNT_LABEL:
+                total_amount = to_amount(value)
+            elif label is not None:
+                payments.append(Payment(method=label, amount=to_amount(value)))
+        elif section == "after_payments":
+            if stripped.startswith(TAX_TABLE_HEADER):
+                section = "taxes"
+                continue
+            section = "footer"
+
+        if section == "taxes":
+            parts = stripped.split()
+            taxes.append(
+                TaxRow(
+                    label=parts[0],
+                    name=" ".join(parts[1:-2]),
+                    rate=parse_float(parts[-2].rstrip("%")),
+                    amount=to_amount(parts[-1]),
+                )
+            )
+        elif section == "tax_total":
+            label, value = _labeled(stripped)
+            if label == TOTAL_TAX_LABEL:
+                total_tax = to_amount(value)
+        elif section == "footer":
+            label, value = _labeled(stripped)
+            if label is None:
+                if last_footer_field is None:
+                    continue
+                # long values wrap onto the next line
+                label = last_footer_field
+                value = footer.fields[label] + value
+            footer.fields[label] = value
+            last_footer_field = label
+            if label in FOOTER_LABELS:
+                setattr(footer, FOOTER_LABELS[label], value)
+
+    # the first item line is the table header ending with the total column
+    if item_lines and ITEMS_HEADER in item_lines[0]:
+        item_lines = item_lines[1:]
+    rates = dict(DEFAULT_VAT_RATES)
+    for tax in taxes:
+        rates[vat_label_key(tax.label)] = vat_rate(tax.rate)
+    items = [build_item(*row, vat_rates=rates) for row in iter_item_lines(item_lines)]
+
+    return Journal(
+        header=header,
+        items=items,
+        total_amount=total_amount,
+        payments=payments,
+        taxes=taxes,
+        total_tax=total_tax,
+        footer=footer,
+    )
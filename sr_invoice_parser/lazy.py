@@ -0,0 +1,36 @@
+"""
+Deferred imports of the heavy dependencies.
+
+`requests`, `parsel` (with lxml), `pytz` and `srtools` make up most of the
+time of importing the package. Modules refer to them through `LazyModule`
+proxies, which import the real module on first attribute access, so code
+paths that never fetch, build a DOM or convert times do not load them.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str) -> None:
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
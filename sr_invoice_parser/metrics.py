@@ -0,0 +1,104 @@
+"""
+Per-stage timing and counters for production observability.
+
+Pass a `Metrics` instance to `InvoiceParser` or `AsyncInvoiceFetcher` to record
+how long each stage and field takes and how it ended, plus fetch status codes
+and retries. Without one, the instrumented code only pays for a `None` check.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+PREFIX = "sr_invoice_parser"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    values = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return f"{{{values}}}"
+
+
+class Metrics:
+    """
+    Collects stage durations and counters.
+
+    Subclass and override `observe()` or `increment()` to forward the values
+    to another metrics system as they are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[Tuple[str, str], StageStats] = defaultdict(StageStats)
+        self.counters: Dict[Tuple[str, Labels], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, ok: bool = True) -> None:
+        """Record the duration and outcome of one run of a stage"""
+
+        with self._lock:
+            stats = self.stages[(stage, "ok" if ok else "error")]
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def increment(self, name: str, value: int = 1, **labels: str) -> None:
+        """Increment a counter, e.g. `increment("fetch_responses", status="200")`"""
+
+        key = (name, tuple(sorted((label, str(v)) for label, v in labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages: Dict[str, dict] = defaultdict(dict)
+            for (stage, outcome), stats in self.stages.items():
+                stages[stage][outcome] = {
+                    "count": stats.count,
+                    "total_seconds": stats.total_seconds,
+                    "max_seconds": stats.max_seconds,
+                }
+            counters: Dict[str, dict] = defaultdict(dict)
+            for (name, labels), value in self.counters.items():
+                counters[name][",".join(f"{k}={v}" for k, v in labels)] = value
+        return {"stages": dict(stages), "counters": dict(counters)}
+
+    def to_openmetrics(self) -> str:
+        """Export the collected values in the OpenMetrics text format"""
+
+        lines = []
+        with self._lock:
+            if self.stages:
+                name = f"{PREFIX}_stage_seconds"
+                lines.append(f"# TYPE {name} summary")
+                lines.append(f"# UNIT {name} seconds")
+                for (stage, outcome), stats in sorted(self.stages.items()):
+                    labels = _format_labels((("stage", stage), ("outcome", outcome)))
+                    lines.append(f"{name}_count{labels} {stats.count}")
+                    lines.append(f"{name}_sum{labels} {stats.total_seconds}")
+
+            counter_names = sorted({name for name, _ in self.counters})
+            for counter_name in counter_names:
+                name = f"{PREFIX}_{counter_name}"
+                lines.append(f"# TYPE {name} counter")
+                for (key, labels), value in sorted(self.counters.items()):
+                    if key == counter_name:
+                        lines.append(f"{name}_total{_format_labels(labels)} {value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,142 @@
+"""
+Compact typed result model.
+
+`Invoice` and `InvoiceItem` use `__slots__`, so holding many parsed invoices
+in memory costs far less than the nested dictionaries returned by `data()`.
+Both convert to and from the `data()` dictionaries and to JSON.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from .amounts import Amount
+from .journal import VatRate
+
+# the parser options a `data()` result depends on, with their defaults
+RESULT_OPTIONS = {
+    "amount_type": "float",
+    "journal_format": "html",
+    "specifications": False,
+    "strict": False,
+}
+OPTIONS_KEY = "_options"
+ITEM_AMOUNTS = ("price", "quantity", "total_price")
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    return value.isoformat()
+
+
+def _to_decimal(value):
+    return Decimal(value) if isinstance(value, str) else value
+
+
+def dumps(data: dict, options: Optional[dict] = None) -> str:
+    """
+    Serialize a `data()` dictionary to JSON, `Decimal` amounts as strings.
+
+    The parser `options` the result was made with are written along with it,
+    so `loads` can restore the amount types.
+    """
+
+    if options is not None:
+        data = {**data, OPTIONS_KEY: options}
+    return json.dumps(data, ensure_ascii=False, default=_json_default)
+
+
+def loads_with_options(text: str) -> Tuple[dict, dict]:
+    """Deserialize a `data()` dictionary and the options it was made with"""
+
+    data = json.loads(text)
+    options = {**RESULT_OPTIONS, **data.pop(OPTIONS_KEY, {})}
+    if data.get("invoice_datetime"):
+        data["invoice_datetime"] = datetime.fromisoformat(data["invoice_datetime"])
+    if options["amount_type"] == "decimal":
+        if "invoice_total_amount" in data:
+            data["invoice_total_amount"] = _to_decimal(data["invoice_total_amount"])
+        for item in data.get("invoice_items") or ():
+            for name in ITEM_AMOUNTS:
+                if name in item:
+                    item[name] = _to_decimal(item[name])
+    return data, options
+
+
+def loads(text: str) -> dict:
+    """Deserialize a `data()` dictionary from JSON"""
+
+    return loads_with_options(text)[0]
+
+
+@dataclass
+class InvoiceItem:
+    __slots__ = ("name", "vat", "price", "quantity", "total_price")
+
+    name: str
+    vat: Optional[VatRate]
+    price: Optional[Amount]
+    quantity: Optional[Amount]
+    total_price: Optional[Amount]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> InvoiceItem:
+        return cls(*(data[name] for name in cls.__slots__))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass
+class Invoice:
+    __slots__ = (
+        "company_name",
+        "company_tin",
+        "buyer_tin",
+        "invoice_number",
+        "invoice_datetime",
+        "invoice_total_amount",
+        "invoice_items",
+        "invoice_text",
+    )
+
+    company_name: str
+    company_tin: str
+    buyer_tin: str
+    invoice_number: str
+    invoice_datetime: datetime
+    invoice_total_amount: Amount
+    invoice_items: Tuple[InvoiceItem, ...]
+    invoice_text: Optional[str]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Invoice:
+        values = {name: data.get(name) for name in cls.__slots__}
+        values["invoice_items"] = tuple(
+            InvoiceItem.from_dict(item) for item in data.get("invoice_items") or ()
+        )
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["invoice_items"] = [item.to_dict() for item in self.invoice_items]
+        return data
+
+    @classmethod
+    def from_json(cls, text: str) -> Invoice:
+        return cls.from_dict(loads(text))
+
+    def to_json(self) -> str:
+        """Serialize to JSON, noting `Decimal` amounts so `from_json` restores them"""
+
+        amounts = [self.invoice_total_amount]
+        for item in self.invoice_items:
+            amounts.extend(getattr(item, name) for name in ITEM_AMOUNTS)
+        if any(isinstance(amount, Decimal) for amount in amounts):
+            return dumps(self.to_dict(), {"amount_type": "decimal"})
+        return dumps(self.to_dict())
@@ -1,36 +1,224 @@
 from __future__ import annotations
 
-import re
+import time
 from datetime import datetime
-from typing import Optional, Tuple, Union
-from urllib.parse import urlparse
-
-import pytz
-import requests
-from parsel import Selector
-from srtools import cyrillic_to_latin
-
+from decimal import Decimal
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+
+from .amounts import PARSERS as AMOUNT_PARSERS
+from .amounts import Amount, parse_float, parse_quantity
+from .datetimes import DATETIME_FORMAT, to_utc
 from .decorators import handle_exception
 from .exceptions import ParserParseException, ParserRequestException
+from .fast import JOURNAL_ID, read_page, scan_anchors
+from .journal import (
+    UNIT_PATTERN,
+    UNKNOWN_VAT_RATE,
+    Journal,
+    JournalImage,
+    VatRate,
+    find_qr_image,
+    iter_item_rows,
+    journal_text,
+    parse_journal,
+    split_item_name,
+    vat_rates,
+)
+from .lazy import LazyModule
+from .models import RESULT_OPTIONS, Invoice
+from .qr import VerificationRecord, decode_verification_url
+from .specifications import SPECIFICATIONS_PATH, find_token, parse_specifications
+
+if TYPE_CHECKING:
+    from .cache import ResponseCache
+    from .metrics import Metrics
+    from .store import ResultStore
+
+etree = LazyModule("lxml.etree")
+parsel = LazyModule("parsel")
+requests = LazyModule("requests")
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(expression: str):
+    """Compile an XPath expression once per process"""
+
+    return etree.XPath(expression)
 
 
 class InvoiceParser:
     ALLOWED_DOMAINS = ["suf.purs.gov.rs"]
-    DATETIME_FORMAT = "%d.%m.%Y. %H:%M:%S"
+    BASE_URL = "https://suf.purs.gov.rs"
+    DATETIME_FORMAT = DATETIME_FORMAT
+    ENGINES = ("dom", "fast")
+    CHUNK_SIZE = 16 * 1024
+    # connect and read timeouts of the specifications request
+    SPECIFICATIONS_TIMEOUT = (5.0, 15.0)
+    SOURCES = ("page", "qr")
+    # the journal as on the page, as plain text, or as plain text with the QR
+    # image replaced by `QR_REFERENCE`
+    JOURNAL_FORMATS = ("html", "text", "reference")
+    QR_REFERENCE = "[QR]"
+    FIELDS = (
+        "company_name",
+        "company_tin",
+        "buyer_tin",
+        "invoice_number",
+        "invoice_datetime",
+        "invoice_total_amount",
+        "invoice_items",
+        "invoice_text",
+    )
+    # the first text of every span and label with an id, in one traversal
+    FIELDS_XPATH = "//span[@id]/text()[1] | //label[@id]/text()[1]"
+    # fields that can be read from the QR code URL without fetching the page
+    QR_FIELDS = (
+        "buyer_tin",
+        "invoice_number",
+        "invoice_datetime",
+        "invoice_total_amount",
+    )
 
     def __init__(
         self,
         url: Optional[str] = None,
         html_text: Optional[str] = None,
+        engine: str = "dom",
+        lazy: bool = False,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ResultStore] = None,
+        metrics: Optional[Metrics] = None,
+        amount_type: str = "float",
+        strict: bool = False,
+        specifications: bool = False,
+        session: Optional[requests.Session] = None,
+        stream: bool = False,
+        max_bytes: Optional[int] = None,
+        journal_format: str = "html",
     ) -> None:
         if not url and not html_text:
             raise ParserParseException("URL or HTML content is required")
+        if engine not in self.ENGINES:
+            raise ParserParseException(f"Unknown engine '{engine}'")
+        if amount_type not in AMOUNT_PARSERS:
+            raise ParserParseException(f"Unknown amount type '{amount_type}'")
+        if journal_format not in self.JOURNAL_FORMATS:
+            raise ParserParseException(f"Unknown journal format '{journal_format}'")
 
         self.url = url
         self.html_text = html_text
+        self.engine = engine
+        self.cache = cache
+        self.store = store
+        self.metrics = metrics
+        self.amount_type = amount_type
+        self.strict = strict
+        self.specifications = specifications
+        self.stream = stream
+        self.max_bytes = max_bytes
+        self.journal_format = journal_format
+        # a session created here is closed once the specifications are read,
+        # pass one to share its connections across invoices
+        self.owns_session = specifications and session is None
+        if self.owns_session:
+            # the page and its specifications share one keep-alive connection
+            session = requests.Session()
+        self.session = session
+        self.cached_data = None
+        if store is not None and url and not html_text:
+            # invoices that were already parsed do not need to be fetched
+            self.cached_data = store.get_by_url(url, self.result_options)
+        if lazy or self.cached_data is not None:
+            return
         if url and not html_text:
             self.html_text = self.fetch()
-        self.html_selector = self.get_html_selector(self.html_text)
+            if self.cached_data is not None:
+                # a cache hit with the parsed result needs no DOM
+                return
+        if engine == "dom":
+            self.html_selector = self.get_html_selector(self.html_text)
+
+    @classmethod
+    def from_response(
+        cls,
+        content: Union[str, bytes],
+        url: Optional[str] = None,
+        **kwargs,
+    ) -> InvoiceParser:
+        """Create a parser from a page already downloaded by the caller"""
+
+        return cls(url=url, html_text=content, lazy=True, **kwargs)
+
+    def load(self) -> Union[str, bytes]:
+        """Fetch the HTML content unless it is already loaded"""
+
+        if not self.html_text:
+            self.html_text = self.fetch()
+        return self.html_text
+
+    async def aload(self, fetcher=None) -> Union[str, bytes]:
+        """
+        Fetch the HTML content from asyncio code unless it is already loaded.
+
+        Pass an `AsyncInvoiceFetcher` to share its pooled session, otherwise
+        `fetch()` runs in the default executor.
+        """
+
+        if not self.html_text:
+            if fetcher is not None:
+                self.html_text = await fetcher.fetch(self.url)
+            else:
+                import asyncio
+
+                loop = asyncio.get_running_loop()
+                self.html_text = await loop.run_in_executor(None, self.fetch)
+        return self.html_text
+
+    @cached_property
+    def html_selector(self):
+        """The page DOM, built on first use for lazy parsers and the fast engine"""
+
+        return self.get_html_selector(self.load())
+
+    @cached_property
+    def fast_anchors(self) -> Dict[str, str]:
+        """Anchor values found by the fast scanner, empty for the DOM engine"""
+
+        if self.engine != "fast":
+            return {}
+        return scan_anchors(self.load())
+
+    def get_span_text(self, span_id: str) -> Optional[str]:
+        """Get the text of the span with the given id"""
+
+        value = self.fast_anchors.get(span_id)
+        if value is None:
+            value = self.page_fields.get(span_id)
+        return value
+
+    @handle_exception()
+    def get_fields(self) -> Dict[str, str]:
+        """
+        Get the text of every span and label with an id, e.g. `addressLabel`.
+
+        The page is traversed once with a precompiled XPath. The first
+        element wins when an id is repeated.
+        """
+
+        fields: Dict[str, str] = {}
+        for text in compile_xpath(self.FIELDS_XPATH)(self.html_selector.root):
+            element = text.getparent()
+            if text.is_tail:
+                # text after a child element belongs to the child's parent
+                element = element.getparent()
+            fields.setdefault(element.get("id"), text.strip())
+        return fields
+
+    @cached_property
+    def page_fields(self) -> Dict[str, str]:
+        return self.get_fields()
 
     def validate_url(self) -> None:
         """Validate the URL to ensure it's from an allowed domain"""
@@ -40,186 +228,434 @@ class InvoiceParser:
             raise ParserRequestException("Invalid domain")
 
     @handle_exception()
-    def get_html_selector(self, html_text: Union[str, bytes]) -> None:
+    def get_html_selector(self, html_text: Union[str, bytes, memoryview]) -> None:
+        if isinstance(html_text, memoryview):
+            # lxml parses from a contiguous bytes object
+            html_text = html_text.tobytes()
         if isinstance(html_text, bytes):
-            html_selector = Selector(body=html_text)
+            html_selector = parsel.Selector(body=html_text)
         else:
-            html_selector = Selector(text=html_text)
+            html_selector = parsel.Selector(text=html_text)
         return html_selector
 
-    def fetch(self) -> str:
-        """Fetch the HTML content from the URL"""
+    def fetch(self) -> Union[str, bytes]:
+        """
+        Fetch the HTML content from the URL.
+
+        With `stream=True` or `max_bytes` the body is read in chunks, returned
+        as bytes and limited to `max_bytes`. `stream=True` also stops reading
+        after the journal.
+        """
 
         self.validate_url()
 
-        response = requests.get(self.url)
+        if self.cache is not None:
+            entry = self.cache.get(self.url)
+            if entry is not None:
+                if self.metrics is not None:
+                    self.metrics.increment("cache_hits")
+                if entry.options == self.result_options:
+                    self.cached_data = entry.data
+                return entry.content
+
+        get = self.session.get if self.session is not None else requests.get
+        streamed = self.stream or self.max_bytes is not None
+        start = time.perf_counter()
+        try:
+            if streamed:
+                response = get(self.url, stream=True)
+            else:
+                response = get(self.url)
+        except requests.RequestException as e:
+            if self.metrics is not None:
+                self.metrics.observe("fetch", time.perf_counter() - start, False)
+            raise ParserRequestException(f"Request failed: {e}")
+        if self.metrics is not None:
+            ok = response.status_code == 200
+            self.metrics.observe("fetch", time.perf_counter() - start, ok)
+            self.metrics.increment("fetch_responses", status=response.status_code)
         if response.status_code != 200:
             raise ParserRequestException(
                 f"Request failed with status code {response.status_code}"
             )
 
-        return response.text
+        if streamed:
+            content = self.read_stream(response)
+        else:
+            content = response.content
+        if self.cache is not None:
+            self.cache.set(self.url, content)
+        return content if streamed else response.text
+
+    def read_stream(self, response) -> bytes:
+        """Read a streamed response, limited to `max_bytes`"""
+
+        with response:
+            length = response.headers.get("Content-Length")
+            if self.max_bytes is not None and length and int(length) > self.max_bytes:
+                raise ParserRequestException(
+                    f"Response is larger than {self.max_bytes} bytes"
+                )
+            # the specifications token comes after the journal, so the whole
+            # page is read when it is needed
+            stop_early = self.stream and not self.specifications
+            chunks = response.iter_content(self.CHUNK_SIZE)
+            content = read_page(chunks, self.max_bytes, stop_early=stop_early)
+        if self.metrics is not None:
+            self.metrics.increment("fetch_bytes", len(content))
+        return content
 
     @handle_exception()
     def get_company_name(self) -> str:
         """Get the company name"""
 
-        value = self.html_selector.css("span#shopFullNameLabel::text").get().strip()
+        value = self.get_span_text("shopFullNameLabel").strip()
         return value
 
     @handle_exception()
     def get_company_tin(self) -> str:
         """Get the company tin/tax identification number"""
 
-        value = self.html_selector.css("span#tinLabel::text").get().strip()
+        value = self.get_span_text("tinLabel").strip()
         return value
 
     @handle_exception()
     def get_buyer_tin(self) -> str:
         """Get the buyer tin/tax identification number"""
 
-        value = self.html_selector.css("span#buyerIdLabel::text").get().strip()
+        value = self.get_span_text("buyerIdLabel").strip()
         if value:
             value = value.split(":")
             if len(value) == 2:
                 return value[1]
         return value
 
+    @handle_exception()
+    def get_status(self) -> str:
+        """Get the verification status, e.g. `Рачун је проверен`"""
+
+        value = self.page_fields.get("invoiceStatusLabel")
+        return value.strip()
+
     def string_to_float(self, string: str) -> float:
-        return float(string.replace(".", "").replace(",", "."))
+        return parse_float(string)
+
+    def parse_amount(self, string: str) -> Amount:
+        """Parse an amount as a float, or as `Decimal` or para if configured"""
+
+        if self.amount_type == "float":
+            return self.string_to_float(string)
+        return AMOUNT_PARSERS[self.amount_type](string)
 
     @handle_exception()
-    def get_total_amount(self) -> float:
+    def get_total_amount(self) -> Amount:
         """Get the total amount of the invoice"""
 
-        value = self.html_selector.css("span#totalAmountLabel::text").get().strip()
-        return self.string_to_float(value)
+        value = self.get_span_text("totalAmountLabel").strip()
+        return self.parse_amount(value)
 
     @handle_exception()
     def get_dt(self) -> datetime:
         """Get the datetime of the invoice"""
 
-        value = self.html_selector.css("span#sdcDateTimeLabel::text").get().strip()
+        value = self.get_span_text("sdcDateTimeLabel").strip()
 
-        dt = datetime.strptime(value, self.DATETIME_FORMAT)
-        belgrade_tz = pytz.timezone("Europe/Belgrade")
-        dt_in_belgrade = belgrade_tz.localize(dt)
-        server_tz = datetime.now().astimezone().tzinfo
-        dt_in_server = dt_in_belgrade.astimezone(server_tz)
-        dt_in_utc = dt_in_server.astimezone(pytz.utc)
-        return dt_in_utc
+        return to_utc(value, self.DATETIME_FORMAT)
 
     @handle_exception()
     def get_invoice_number(self) -> str:
         """Get the invoice number"""
 
-        value = self.html_selector.css("span#invoiceNumberLabel::text").get().strip()
+        value = self.get_span_text("invoiceNumberLabel").strip()
         return value
 
+    def get_journal_html(self) -> str:
+        """Get the `<pre>` block of the journal as it is on the page"""
+
+        value = self.fast_anchors.get(JOURNAL_ID)
+        if value is None:
+            value = self.html_selector.css("div#collapse3 > div > pre").get()
+        return value.strip()
+
     @handle_exception()
     def get_invoice_text(self) -> str:
-        """Get the invoice text"""
+        """Get the invoice text in the `journal_format` of the parser"""
 
-        value = self.html_selector.css("div#collapse3 > div > pre").get().strip()
+        value = self.get_journal_html()
+        if self.journal_format == "text":
+            value = journal_text(value)
+        elif self.journal_format == "reference":
+            value = journal_text(value, self.QR_REFERENCE)
         return value
 
-    def get_name_and_vat_from_item_string(self, item_string) -> Tuple[str, int]:
+    @handle_exception()
+    def get_qr_image(self) -> Optional[JournalImage]:
+        """Get the QR code image of the journal, decoded when `data` is read"""
+
+        return find_qr_image(self.get_journal_html())
+
+    def get_name_and_vat_from_item_string(
+        self, item_string: str, vat_rates: Optional[Dict[str, VatRate]] = None
+    ) -> Tuple[str, VatRate]:
         """
         Izvlači PDV iz stringa stavke.
         """
-        VAT_MAP = {
-            "a": 0,
-            "e": 10,
-            "g": 0,
-            "đ": 20,
-        }
-        item_string = cyrillic_to_latin(item_string).strip()
-        item_string_lower = item_string.lower()
-        vat = 0
 
-        if item_string_lower.strip()[-3] == "(":
-            vat_char = item_string_lower.strip()[-2].lower()
-            vat = VAT_MAP.get(vat_char, 20)
-            item_string = item_string[:-3]
+        name, label = split_item_name(item_string)
+        if label is None:
+            return name, 0
+        if vat_rates is None:
+            vat_rates = self.vat_rates
+        return name, vat_rates.get(label, UNKNOWN_VAT_RATE)
+
+    def iter_items(self, invoice_text: Union[str, None] = None) -> Iterator[dict]:
+        """Yield the items from the invoice one by one while reading the journal"""
 
-        return item_string.strip(), vat
+        if not invoice_text:
+            invoice_text = self.invoice_text
+
+        rates = vat_rates(invoice_text)
+        for row in iter_item_rows(invoice_text):
+            yield self.build_item(*row, vat_rates=rates)
+
+    def build_item(
+        self,
+        name: str,
+        price: Optional[str],
+        quantity: Optional[str],
+        total_price: Optional[str],
+        vat_rates: Optional[Dict[str, VatRate]] = None,
+    ) -> dict:
+        """Build an item from the raw values of a journal item row"""
+
+        if price is None:
+            if self.strict:
+                raise ParserParseException(f"Item '{name}' has no price line")
+            # the journal ended before the price line of this item
+            return {
+                "name": name,
+                "vat": None,
+                "price": None,
+                "quantity": None,
+                "total_price": None,
+            }
+
+        name, vat = self.get_name_and_vat_from_item_string(name, vat_rates)
+        item = {
+            "name": name,
+            "vat": vat,
+            "price": self.parse_amount(price),
+            "quantity": parse_quantity(
+                UNIT_PATTERN.sub("", quantity), self.amount_type
+            ),
+            "total_price": self.parse_amount(total_price),
+        }
+        if self.strict:
+            self.validate_item(item)
+        return item
+
+    def validate_item(self, item: dict) -> None:
+        """Check that the price times the quantity matches the total price"""
+
+        # totals are rounded to whole para
+        tolerance = 1 if self.amount_type == "para" else Decimal("0.01")
+        difference = abs(
+            Decimal(str(item["price"])) * Decimal(str(item["quantity"]))
+            - Decimal(str(item["total_price"]))
+        )
+        if difference > tolerance:
+            raise ParserParseException(
+                f"Item '{item['name']}' total {item['total_price']} does not match "
+                f"price {item['price']} * quantity {item['quantity']}"
+            )
 
     @handle_exception()
     def get_items(self, invoice_text: Union[str, None] = None) -> list[dict]:
         """Get all the items from the invoice as array of objects"""
 
-        if not invoice_text:
-            invoice_text = self.get_invoice_text()
-        invoice_items = (
-            invoice_text.split("========================================")[1]
-            .split("----------------------------------------")[0]
-            .split("Укупно")[1]
-            .strip()
-        )
-        if "\r\n" in invoice_items:
-            invoice_items = invoice_items.split("\r\n")
-        elif "\n" in invoice_items:
-            invoice_items = invoice_items.split("\n")
-
-        items = []
-        new_item = True
-        for item in invoice_items:
-            item = re.sub(" +", " ", item)
-            if new_item:
-                data = {
-                    "name": item,
-                    "vat": None,
-                    "price": None,
-                    "quantity": None,
-                    "total_price": None,
-                }
-                items.append(data)
-                new_item = False
-            else:
-                row_array = item.split()
-
-                try:
-                    # if the row is a number, then name is finished and we update price and quantity
-                    price = self.string_to_float(row_array[0])
-                    quantity = int(row_array[1])
-                    total_price = self.string_to_float(row_array[2])
-                    item, vat = self.get_name_and_vat_from_item_string(
-                        items[-1]["name"]
-                    )
-
-                    items[-1]["name"] = item
-                    items[-1]["vat"] = vat
-                    items[-1]["price"] = price
-                    items[-1]["quantity"] = quantity
-                    items[-1]["total_price"] = total_price
-
-                    new_item = True
-                except ValueError:
-                    # row is part of the item name, append it to the name
-                    # if item.startswith(" "):
-                    # items[-1]["name"] += ""
-                    items[-1]["name"] += item
+        return list(self.iter_items(invoice_text))
+
+    def fetch_specifications(self) -> bytes:
+        """Request the specifications JSON with the token found in the page"""
+
+        try:
+            token = find_token(self.load())
+            if token is None:
+                raise ParserParseException("Specifications token not found in the page")
+            if self.url:
+                self.validate_url()
+            url = urljoin(self.url or self.BASE_URL, SPECIFICATIONS_PATH)
+            session = self.session if self.session is not None else requests
+            try:
+                response = session.post(
+                    url,
+                    data={"invoiceNumber": self.invoice_number, "token": token},
+                    timeout=self.SPECIFICATIONS_TIMEOUT,
+                )
+            except requests.RequestException as e:
+                raise ParserRequestException(f"Specifications request failed: {e}")
+        finally:
+            # nothing else is fetched for this invoice
+            self.close()
+        if response.status_code != 200:
+            raise ParserRequestException(
+                f"Specifications request failed with status code {response.status_code}"
+            )
+        return response.content
+
+    def close(self) -> None:
+        """Close the session if the parser created it"""
+
+        if self.owns_session:
+            self.session.close()
+            self.session = None
+            self.owns_session = False
+
+    @handle_exception()
+    def get_specification_items(self) -> list[dict]:
+        """Get the items from the specifications endpoint instead of the journal"""
 
+        items = parse_specifications(self.fetch_specifications(), self.amount_type)
+        if self.strict:
+            for item in items:
+                self.validate_item(item)
         return items
 
-    def data(self) -> dict:
-        """Parse and return the data from the invoice"""
-
-        company_name = self.get_company_name()
-        company_tin = self.get_company_tin()
-        buyer_tin = self.get_buyer_tin()
-        total_amount = self.get_total_amount()
-        invoice_number = self.get_invoice_number()
-        invoice_text = self.get_invoice_text()
-        invoice_items = self.get_items(invoice_text)
-        dt = self.get_dt()
-        return {
-            "company_name": company_name,
-            "company_tin": company_tin,
-            "buyer_tin": buyer_tin,
-            "invoice_number": invoice_number,
-            "invoice_datetime": dt,
-            "invoice_total_amount": total_amount,
-            "invoice_items": invoice_items,
-            "invoice_text": invoice_text,
+    @handle_exception()
+    def parse_journal(self, invoice_text: Union[str, None] = None) -> Journal:
+        """
+        Parse the whole journal: header, items, payments, taxes and footer.
+        """
+
+        if not invoice_text:
+            invoice_text = self.invoice_text
+        return parse_journal(invoice_text, self.build_item, self.parse_amount)
+
+    @cached_property
+    def company_name(self) -> str:
+        return self.get_company_name()
+
+    @cached_property
+    def company_tin(self) -> str:
+        return self.get_company_tin()
+
+    @cached_property
+    def buyer_tin(self) -> str:
+        return self.get_buyer_tin()
+
+    @cached_property
+    def invoice_number(self) -> str:
+        return self.get_invoice_number()
+
+    @cached_property
+    def invoice_datetime(self) -> datetime:
+        return self.get_dt()
+
+    @cached_property
+    def invoice_total_amount(self) -> Amount:
+        return self.get_total_amount()
+
+    @cached_property
+    def invoice_items(self) -> list[dict]:
+        if self.specifications:
+            try:
+                return self.get_specification_items()
+            except (ParserParseException, ParserRequestException):
+                # fall back to reading the items from the journal
+                if self.metrics is not None:
+                    self.metrics.increment("specifications_fallbacks")
+        return self.get_items(self.invoice_text)
+
+    @cached_property
+    def invoice_text(self) -> str:
+        return self.get_invoice_text()
+
+    @cached_property
+    def vat_rates(self) -> Dict[str, VatRate]:
+        return vat_rates(self.invoice_text)
+
+    @cached_property
+    def verification_record(self) -> VerificationRecord:
+        """The verification record decoded from the QR code URL"""
+
+        if not self.url:
+            raise ParserParseException("URL is required to decode the QR code")
+        return decode_verification_url(self.url)
+
+    def get_qr_data(self, fields: Iterable[str]) -> dict:
+        """Read fields from the QR code URL without fetching the page"""
+
+        unavailable = [field for field in fields if field not in self.QR_FIELDS]
+        if unavailable:
+            raise ParserParseException(
+                f"Fields not in the QR code: {', '.join(unavailable)}"
+            )
+        record = self.verification_record
+        values = {
+            "buyer_tin": (record.buyer_id or "").split(":")[-1],
+            "invoice_number": record.invoice_number,
+            "invoice_datetime": record.invoice_datetime,
+            "invoice_total_amount": record.get_total_amount(self.amount_type),
         }
+        return {field: values[field] for field in fields}
+
+    def data(
+        self, fields: Optional[Iterable[str]] = None, source: str = "page"
+    ) -> dict:
+        """
+        Parse and return the data from the invoice.
+
+        Each field is computed once and cached on the parser. Pass `fields` to
+        compute only some of them, e.g. `data(fields=["invoice_number"])`.
+        With a response cache or a result store, a previously parsed result
+        is reused. With `source="qr"` the `QR_FIELDS` are decoded from the URL
+        and a lazy parser does not fetch the page at all.
+        """
+
+        if source not in self.SOURCES:
+            raise ParserParseException(f"Unknown source '{source}'")
+
+        if fields is None:
+            fields = self.QR_FIELDS if source == "qr" else self.FIELDS
+        else:
+            fields = list(fields)
+            unknown = [field for field in fields if field not in self.FIELDS]
+            if unknown:
+                raise ParserParseException(f"Unknown fields: {', '.join(unknown)}")
+
+        if source == "qr":
+            return self.get_qr_data(fields)
+
+        if self.cached_data is None and self.cache is not None and self.url:
+            # a cache hit while loading fills `cached_data`
+            self.load()
+        if self.cached_data is not None:
+            return {field: self.cached_data[field] for field in fields}
+
+        data = {field: getattr(self, field) for field in fields}
+        if len(data) == len(self.FIELDS):
+            self.save(data)
+        return data
+
+    @property
+    def result_options(self) -> dict:
+        """The options of this parser that `data()` results depend on"""
+
+        return {name: getattr(self, name) for name in RESULT_OPTIONS}
+
+    def get_invoice(self, include_text: bool = True) -> Invoice:
+        """Parse the invoice into the compact `Invoice` model"""
+
+        fields = self.FIELDS
+        if not include_text:
+            fields = [field for field in fields if field != "invoice_text"]
+        return Invoice.from_dict(self.data(fields=fields))
+
+    def save(self, data: dict) -> None:
+        """Keep a fully parsed result in the response cache and result store"""
+
+        options = self.result_options
+        if self.cache is not None and self.url:
+            self.cache.set_data(self.url, data, options)
+        if self.store is not None:
+            self.store.put(data, url=self.url, options=options)
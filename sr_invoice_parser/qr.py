@@ -0,0 +1,133 @@
+"""
+Offline decoding of the verification record in the QR code URL.
+
+The `vl` parameter of a `suf.purs.gov.rs` URL is the base64 encoded TaxCore
+verification record. It holds the invoice number, counters, total amount,
+PFR time and buyer id, followed by encrypted internal data, the signature and
+an MD5 hash of everything before it. Decoding it needs no request.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .amounts import Amount
+from .exceptions import ParserParseException
+from .lazy import LazyModule
+
+pytz = LazyModule("pytz")
+
+# version, requested by, signed by, total counter, transaction type counter
+# and total amount in 1/10000 dinar, little-endian
+HEADER = struct.Struct("<B8s8sIIQ")
+# PFR time in milliseconds since the epoch, big-endian
+PFR_TIME = struct.Struct(">Q")
+SIGNATURE_SIZE = 256
+HASH_SIZE = 16
+
+URL_SAFE_TO_STANDARD = str.maketrans({" ": "+", "-": "+", "_": "/"})
+
+INVOICE_TYPES = {0: "П", 1: "Р", 2: "К", 3: "О", 4: "А"}
+TRANSACTION_TYPES = {0: "П", 1: "Р"}
+
+
+@dataclass
+class VerificationRecord:
+    version: int
+    requested_by: str
+    signed_by: str
+    total_counter: int
+    transaction_type_counter: int
+    total_amount: int
+    invoice_datetime: datetime
+    invoice_type: int
+    transaction_type: int
+    buyer_id: Optional[str]
+    encrypted_internal_data: bytes
+    signature: bytes
+
+    @property
+    def invoice_number(self) -> str:
+        return f"{self.requested_by}-{self.signed_by}-{self.total_counter}"
+
+    @property
+    def invoice_counter(self) -> str:
+        """The receipt counter as printed in the journal, e.g. `175097/188553ПП`"""
+
+        return (
+            f"{self.transaction_type_counter}/{self.total_counter}"
+            f"{INVOICE_TYPES.get(self.invoice_type, '')}"
+            f"{TRANSACTION_TYPES.get(self.transaction_type, '')}"
+        )
+
+    def get_total_amount(self, kind: str = "float") -> Amount:
+        """The total amount as a `float`, `Decimal` or integer para"""
+
+        if kind == "para":
+            return self.total_amount // 100
+        amount = Decimal(self.total_amount).scaleb(-4).quantize(Decimal("0.01"))
+        if kind == "decimal":
+            return amount
+        return float(amount)
+
+
+def decode_verification(payload: bytes) -> VerificationRecord:
+    """Decode a binary verification record, checking its hash"""
+
+    fixed_size = HEADER.size + PFR_TIME.size + 3
+    if len(payload) < fixed_size + SIGNATURE_SIZE + HASH_SIZE:
+        raise ParserParseException("Verification record is too short")
+    if hashlib.md5(payload[:-HASH_SIZE]).digest() != payload[-HASH_SIZE:]:
+        raise ParserParseException("Verification record hash does not match")
+
+    version, requested_by, signed_by, total_counter, type_counter, amount = (
+        HEADER.unpack_from(payload)
+    )
+    (milliseconds,) = PFR_TIME.unpack_from(payload, HEADER.size)
+    position = HEADER.size + PFR_TIME.size
+    invoice_type, transaction_type, buyer_id_size = payload[position : position + 3]
+    position += 3
+    buyer_id = payload[position : position + buyer_id_size].decode("utf-8")
+    position += buyer_id_size
+    signature_at = len(payload) - HASH_SIZE - SIGNATURE_SIZE
+    if signature_at < position:
+        raise ParserParseException("Verification record is too short")
+
+    return VerificationRecord(
+        version=version,
+        requested_by=requested_by.decode("ascii"),
+        signed_by=signed_by.decode("ascii"),
+        total_counter=total_counter,
+        transaction_type_counter=type_counter,
+        total_amount=amount,
+        invoice_datetime=datetime.fromtimestamp(milliseconds / 1000, pytz.utc),
+        invoice_type=invoice_type,
+        transaction_type=transaction_type,
+        buyer_id=buyer_id or None,
+        encrypted_internal_data=payload[position:signature_at],
+        signature=payload[signature_at:-HASH_SIZE],
+    )
+
+
+def decode_verification_url(url: str) -> VerificationRecord:
+    """Decode the `vl` parameter of a verification URL without fetching it"""
+
+    values = parse_qs(urlparse(url).query).get("vl")
+    if not values:
+        raise ParserParseException("Verification URL has no 'vl' parameter")
+    # `+` is often decoded to a space when the URL is passed around, and
+    # some scanners use the URL-safe alphabet
+    value = values[0].translate(URL_SAFE_TO_STANDARD).strip()
+    try:
+        payload = base64.b64decode(value + "=" * (-len(value) % 4), validate=True)
+    except binascii.Error as e:
+        raise ParserParseException(f"Invalid verification URL: {e}")
+    return decode_verification(payload)
@@ -0,0 +1,234 @@
+"""
+Re-verification of invoices that are not final yet.
+
+An invoice scanned right after the sale can still be in processing, and its
+page shows a status other than `Рачун је проверен`. `ReverificationScheduler`
+keeps such invoices in a priority queue ordered by their next check and
+re-fetches only those, backing off exponentially while the status stays the
+same. Requests are conditional when the server sent an `ETag` or
+`Last-Modified`, and a `StatusChange` is emitted whenever the status changes.
+Invoices leave the queue once they are final.
+"""
+
+from __future__ import annotations
+
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from .cache import FINAL_STATUS
+from .exceptions import ParserParseException, ParserRequestException
+from .lazy import LazyModule
+from .metrics import Metrics
+from .parser import InvoiceParser
+
+requests = LazyModule("requests")
+
+FINAL_STATUS_TEXT = FINAL_STATUS.decode("utf-8")
+
+
+@dataclass(order=True)
+class PendingInvoice:
+    """An invoice waiting for its next check at `due`"""
+
+    due: float
+    url: str = field(compare=False)
+    status: Optional[str] = field(default=None, compare=False)
+    attempts: int = field(default=0, compare=False)
+    etag: Optional[str] = field(default=None, compare=False)
+    last_modified: Optional[str] = field(default=None, compare=False)
+
+
+@dataclass
+class StatusChange:
+    """The status of an invoice changed, `data` is set once it is final"""
+
+    url: str
+    status: str
+    previous: Optional[str] = None
+    data: Optional[dict] = None
+
+    @property
+    def final(self) -> bool:
+        return self.status == FINAL_STATUS_TEXT
+
+
+class ReverificationScheduler:
+    """
+    Re-check invoices until they are final, with exponential backoff.
+
+    The n-th unchanged check of an invoice is followed by a delay of
+    `initial_delay * factor ** n`, capped at `max_delay` and jittered by up to
+    `jitter` of its length. Invoices are dropped after `max_attempts` checks
+    when it is set. Extra keyword arguments are passed to `InvoiceParser`, e.g.
+    a `store` to keep the final results.
+    """
+
+    ALLOWED_DOMAINS = InvoiceParser.ALLOWED_DOMAINS
+
+    def __init__(
+        self,
+        initial_delay: float = 60.0,
+        max_delay: float = 86400.0,
+        factor: float = 2.0,
+        jitter: float = 0.1,
+        max_attempts: Optional[int] = None,
+        timeout: float = 15.0,
+        allowed_domains: Optional[Sequence[str]] = None,
+        session: Optional[requests.Session] = None,
+        metrics: Optional[Metrics] = None,
+        clock: Callable[[], float] = time.time,
+        **parser_options,
+    ) -> None:
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.allowed_domains = list(allowed_domains or self.ALLOWED_DOMAINS)
+        # a session passed in belongs to the caller and is left open
+        self.owns_session = session is None
+        self.session = session or requests.Session()
+        self.metrics = metrics
+        self.clock = clock
+        self.parser_options = parser_options
+
+        self.queue: List[PendingInvoice] = []
+        # the latest entry of every URL, older ones left in the heap are skipped
+        self.pending: Dict[str, PendingInvoice] = {}
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.pending
+
+    def close(self) -> None:
+        if self.owns_session:
+            self.session.close()
+
+    def add(self, url: str, status: Optional[str] = None, delay: float = 0.0) -> None:
+        """Schedule an invoice, checked after `delay` seconds"""
+
+        if urlparse(url).netloc not in self.allowed_domains:
+            raise ParserRequestException("Invalid domain")
+        if status == FINAL_STATUS_TEXT:
+            return
+        self._push(PendingInvoice(due=self.clock() + delay, url=url, status=status))
+
+    def remove(self, url: str) -> None:
+        self.pending.pop(url, None)
+
+    @property
+    def next_due(self) -> Optional[float]:
+        """When the next invoice is due, `None` if nothing is pending"""
+
+        self._drop_stale()
+        return self.queue[0].due if self.queue else None
+
+    def _push(self, invoice: PendingInvoice) -> None:
+        self.pending[invoice.url] = invoice
+        heapq.heappush(self.queue, invoice)
+
+    def _drop_stale(self) -> None:
+        while self.queue and self.pending.get(self.queue[0].url) is not self.queue[0]:
+            heapq.heappop(self.queue)
+
+    def _delay(self, attempts: int) -> float:
+        delay = min(self.initial_delay * self.factor**attempts, self.max_delay)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _reschedule(self, invoice: PendingInvoice, now: float) -> None:
+        invoice.attempts += 1
+        if self.max_attempts is not None and invoice.attempts >= self.max_attempts:
+            self.pending.pop(invoice.url, None)
+            return
+        invoice.due = now + self._delay(invoice.attempts - 1)
+        self._push(invoice)
+
+    def run_pending(self) -> List[StatusChange]:
+        """Check every invoice that is due and return the status changes"""
+
+        now = self.clock()
+        due = []
+        self._drop_stale()
+        while self.queue and self.queue[0].due <= now:
+            due.append(heapq.heappop(self.queue))
+            self._drop_stale()
+
+        changes = []
+        for invoice in due:
+            change = self.check(invoice)
+            if change is not None:
+                changes.append(change)
+        return changes
+
+    def run(
+        self, sleep: Callable[[float], None] = time.sleep
+    ) -> Iterator[StatusChange]:
+        """Keep checking until no invoice is pending, yielding status changes"""
+
+        while self.pending:
+            yield from self.run_pending()
+            next_due = self.next_due
+            if next_due is not None:
+                sleep(max(0.0, next_due - self.clock()))
+
+    def check(self, invoice: PendingInvoice) -> Optional[StatusChange]:
+        """Re-fetch one invoice and reschedule it unless it is final"""
+
+        headers = {}
+        if invoice.etag:
+            headers["If-None-Match"] = invoice.etag
+        if invoice.last_modified:
+            headers["If-Modified-Since"] = invoice.last_modified
+
+        try:
+            response = self.session.get(
+                invoice.url, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException:
+            response = None
+        if self.metrics is not None:
+            status = "error" if response is None else response.status_code
+            self.metrics.increment("reverification_responses", status=status)
+
+        now = self.clock()
+        if response is None or response.status_code != 200:
+            # unchanged since the last check, or failed and tried again later
+            self._reschedule(invoice, now)
+            return None
+
+        invoice.etag = response.headers.get("ETag")
+        invoice.last_modified = response.headers.get("Last-Modified")
+        parser = InvoiceParser.from_response(
+            response.content, url=invoice.url, **self.parser_options
+        )
+        try:
+            status = parser.get_status()
+        except ParserParseException:
+            self._reschedule(invoice, now)
+            return None
+
+        if status == invoice.status:
+            self._reschedule(invoice, now)
+            return None
+
+        change = StatusChange(url=invoice.url, status=status, previous=invoice.status)
+        if change.final:
+            self.pending.pop(invoice.url, None)
+            try:
+                change.data = parser.data()
+            except ParserParseException:
+                pass
+            return change
+
+        # a new status starts the backoff over
+        invoice.status = status
+        invoice.attempts = 0
+        self._reschedule(invoice, now)
+        return change
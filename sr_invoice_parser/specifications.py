@@ -0,0 +1,112 @@
+"""
+Structured invoice items from the TaxCore specifications endpoint.
+
+The verification page fills its specification table from a small JSON
+endpoint, posting the invoice number and a token embedded in the page. The
+JSON has exact item amounts and VAT labels, so reading it avoids the text
+heuristics of the journal parser.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from decimal import Decimal
+from typing import Dict, List, Optional, Union
+
+from .amounts import Amount
+from .exceptions import ParserParseException
+from .journal import (
+    DEFAULT_VAT_RATES,
+    UNKNOWN_VAT_RATE,
+    split_item_name,
+    vat_label_key,
+    vat_rate,
+)
+
+SPECIFICATIONS_PATH = "/specifications"
+
+# e.g. `viewModel.Token('...')`, `token: '...'` or `data-token="..."`
+TOKEN_PATTERN = re.compile(
+    r"""\btoken['"]?\s*[:=(,]\s*['"](?P<token>[^'"\s]+)['"]""", re.IGNORECASE
+)
+
+
+def find_token(html: Union[str, bytes, memoryview]) -> Optional[str]:
+    """Find the specifications token in the page, `None` if it has none"""
+
+    if not isinstance(html, str):
+        # bytes or a `memoryview` page from an archive
+        html = bytes(html).decode("utf-8", "replace")
+    match = TOKEN_PATTERN.search(html)
+    return match["token"] if match else None
+
+
+def to_amount(value: Decimal, kind: str = "float") -> Amount:
+    """Convert an exact JSON number to the configured amount type"""
+
+    if kind == "decimal":
+        return value
+    if kind == "para":
+        return int((value * 100).to_integral_value())
+    return float(value)
+
+
+def to_quantity(value: Decimal, kind: str = "float") -> Union[int, float, Decimal]:
+    """Keep whole quantities as integers, like `parse_quantity`"""
+
+    if value == value.to_integral_value():
+        return int(value)
+    if kind == "decimal":
+        return value
+    return float(value)
+
+
+def _lower_keys(row: dict) -> Dict[str, object]:
+    return {key.lower(): value for key, value in row.items()}
+
+
+def parse_specifications(content: Union[str, bytes], kind: str = "float") -> List[dict]:
+    """
+    Parse the specifications JSON into the item dictionaries of `get_items`.
+
+    Keys are matched case-insensitively, so both the `unitPrice` keys of the
+    endpoint and the `UnitPrice` names of the page bindings are accepted.
+    """
+
+    try:
+        payload = json.loads(content, parse_float=Decimal, parse_int=Decimal)
+    except ValueError as e:
+        raise ParserParseException(f"Invalid specifications response: {e}")
+
+    if isinstance(payload, dict):
+        payload = _lower_keys(payload)
+        if payload.get("success") is False:
+            raise ParserParseException("Specifications request was not successful")
+        rows = payload.get("items", payload.get("specifications"))
+    else:
+        rows = payload
+    if not isinstance(rows, list):
+        raise ParserParseException("Specifications response has no items")
+
+    items = []
+    for row in map(_lower_keys, rows):
+        name, label = split_item_name(row["name"])
+        if row.get("label"):
+            label = vat_label_key(row["label"])
+        if row.get("labelrate") is not None:
+            vat = vat_rate(float(row["labelrate"]))
+        elif label is not None:
+            vat = DEFAULT_VAT_RATES.get(label, UNKNOWN_VAT_RATE)
+        else:
+            vat = 0
+        items.append(
+            {
+                "name": name,
+                "vat": vat,
+                "price": to_amount(row["unitprice"], kind),
+                "quantity": to_quantity(row["quantity"], kind),
+                "total_price": to_amount(row["total"], kind),
+            }
+        )
+    return items
@@ -0,0 +1,133 @@
+"""
+Persistent store of parsed invoices.
+
+`ResultStore` keeps the `data()` result of every parsed invoice in a SQLite
+database, indexed by the invoice number and by the `vl` token of its QR URL,
+so a parser can skip fetching invoices that are already known.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from .cache import cache_key
+from .models import dumps, loads, loads_with_options
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    invoice_number TEXT PRIMARY KEY,
+    vl_key TEXT,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS invoices_vl_key ON invoices (vl_key);
+"""
+
+# SQLite limits the number of bound parameters per statement
+MAX_PARAMETERS = 500
+
+
+class ResultStore:
+    """SQLite backed store of parsed invoices"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> ResultStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __contains__(self, invoice_number: str) -> bool:
+        return self.get(invoice_number) is not None
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+
+    def put(
+        self, data: dict, url: Optional[str] = None, options: Optional[dict] = None
+    ) -> None:
+        """Store the parsed data, replacing any previous version"""
+
+        self.put_many([(data, url)], options)
+
+    def put_many(
+        self, records: Iterable[tuple], options: Optional[dict] = None
+    ) -> None:
+        """
+        Store many `(data, url)` pairs in one transaction.
+
+        `options` are the parser options the results were made with, e.g.
+        `{"amount_type": "decimal"}`, needed to restore `Decimal` amounts.
+        """
+
+        rows = (
+            (
+                data["invoice_number"],
+                cache_key(url) if url else None,
+                dumps(data, options),
+            )
+            for data, url in records
+        )
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO invoices (invoice_number, vl_key, data) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def get(self, invoice_number: str) -> Optional[dict]:
+        row = self.connection.execute(
+            "SELECT data FROM invoices WHERE invoice_number = ?", (invoice_number,)
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def get_by_url(self, url: str, options: Optional[dict] = None) -> Optional[dict]:
+        """
+        Look up an invoice by the `vl` token of its QR URL.
+
+        With `options`, results made with other parser options are left out.
+        """
+
+        row = self.connection.execute(
+            "SELECT data FROM invoices WHERE vl_key = ?", (cache_key(url),)
+        ).fetchone()
+        if row is None:
+            return None
+        data, stored_options = loads_with_options(row[0])
+        if options is not None and stored_options != options:
+            return None
+        return data
+
+    def get_many(self, invoice_numbers: Iterable[str]) -> Dict[str, dict]:
+        """Look up many invoices at once, missing ones are left out"""
+
+        invoice_numbers = list(invoice_numbers)
+        found = {}
+        for start in range(0, len(invoice_numbers), MAX_PARAMETERS):
+            chunk: List[str] = invoice_numbers[start : start + MAX_PARAMETERS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                "SELECT invoice_number, data FROM invoices "
+                f"WHERE invoice_number IN ({placeholders})",
+                chunk,
+            )
+            found.update((number, loads(data)) for number, data in rows)
+        return found
+
+    def delete(self, invoice_number: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM invoices WHERE invoice_number = ?", (invoice_number,)
+            )
+
+    def compact(self) -> None:
+        """Reclaim space left by replaced and deleted invoices"""
+
+        self.connection.execute("VACUUM")
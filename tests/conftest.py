@@ -0,0 +1,25 @@
+"""Fixtures shared by the tests"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Iterator, List, Type
+
+import pytest
+from helpers import LocalServer
+
+
+@pytest.fixture
+def serve() -> Iterator[Callable[[Type[BaseHTTPRequestHandler]], LocalServer]]:
+    """Start a `LocalServer` for a handler, shut down after the test"""
+
+    servers: List[LocalServer] = []
+
+    def start(handler: Type[BaseHTTPRequestHandler]) -> LocalServer:
+        server = LocalServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
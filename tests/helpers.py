@@ -0,0 +1,46 @@
+"""
+Shared test helpers: the example invoice page and a local HTTP server.
+
+Network tests serve stub pages from `LocalServer`, started for a request
+handler with the `serve` fixture from `conftest.py` or as a context manager.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Type
+
+EXAMPLE_RESPONSE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "example_response.html"
+)
+
+
+def read_example_response() -> bytes:
+    with open(EXAMPLE_RESPONSE_PATH, "rb") as file:
+        content = file.read()
+    return content
+
+
+class LocalServer:
+    """A `ThreadingHTTPServer` running `handler` on a free local port"""
+
+    def __init__(self, handler: Type[BaseHTTPRequestHandler]) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.host = f"127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def __enter__(self) -> LocalServer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def url(self, path: str = "/") -> str:
+        return f"http://{self.host}{path}"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from unittest import TestCase
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.amounts import (
+    parse_amount,
+    parse_amounts,
+    parse_decimal,
+    parse_float,
+    parse_para,
+)
+from sr_invoice_parser.exceptions import ParserParseException
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class TestAmounts(TestCase):
+    def test_parse_float(self):
+        assert parse_float("8.960,00") == 8960.0
+        assert parse_float("1.234.567,89") == 1234567.89
+        assert parse_float("-0,05") == -0.05
+
+    def test_parse_decimal(self):
+        assert parse_decimal("8.960,00") == Decimal("8960.00")
+        assert str(parse_decimal(" 0,10 ")) == "0.10"
+
+    def test_parse_para(self):
+        assert parse_para("8.960,00") == 896000
+        assert parse_para("1.234.567,89") == 123456789
+        assert parse_para("-0,5") == -50
+        assert parse_para("12") == 1200
+        with pytest.raises(ValueError, match="more than 2 decimals"):
+            parse_para("0,456")
+
+    def test_parse_amounts(self):
+        """Test that para sums are exact where float sums are not"""
+
+        values = ["0,10"] * 10
+        assert sum(parse_amounts(values, "para")) == 100
+        assert sum(parse_amounts(values)) != 1.0
+        assert sum(parse_amounts(values, "decimal")) == Decimal("1.00")
+        assert parse_amount("1,00", "para") == 100
+
+    def test_parser_amount_type(self):
+        parser = InvoiceParser(html_text=read_example_response(), amount_type="para")
+        data = parser.data()
+
+        assert data["invoice_total_amount"] == 896000
+        assert sum(item["total_price"] for item in data["invoice_items"]) == 896000
+
+        parser = InvoiceParser(html_text=read_example_response(), amount_type="decimal")
+        assert parser.get_total_amount() == Decimal("8960.00")
+
+        with pytest.raises(ParserParseException, match="Unknown amount type 'cents'"):
+            InvoiceParser(html_text=read_example_response(), amount_type="cents")
@@ -0,0 +1,130 @@
+import io
+import os
+import tarfile
+import tempfile
+from unittest import TestCase
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.archive import (
+    ArchiveEntry,
+    ConcatenatedArchive,
+    TarArchive,
+    _Archive,
+    open_archive,
+)
+from sr_invoice_parser.batch import parse_many
+from sr_invoice_parser.parser import InvoiceParser
+
+URL = "https://suf.purs.gov.rs/v/?vl=QUJD"
+
+
+def record(headers, payload):
+    lines = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    return (
+        f"WARC/1.0\r\n{lines}Content-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+        + b"\r\n\r\n"
+    )
+
+
+class TestArchive(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_tar(self, name, mode, pages):
+        with tarfile.open(self.path(name), mode) as bundle:
+            for member, content in pages.items():
+                info = tarfile.TarInfo(member)
+                info.size = len(content)
+                bundle.addfile(info, io.BytesIO(content))
+        return self.path(name)
+
+    def test_concatenated(self):
+        """Test that pages are indexed and returned as views of the mapping"""
+
+        with open(self.path("pages.warc"), "wb") as file:
+            file.write(record({"WARC-Type": "warcinfo"}, b"software: test"))
+            file.write(
+                record(
+                    {"WARC-Type": "response", "WARC-Target-URI": URL},
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n"
+                    + self.example_response,
+                )
+            )
+            file.write(record({"WARC-Type": "resource"}, b"<html></html>"))
+
+        with ConcatenatedArchive(self.path("pages.warc")) as archive:
+            assert len(archive) == 2
+            assert archive.entries[0].name == URL
+            assert archive.entries[1].name == "record-1"
+
+            page = archive[0]
+            assert isinstance(page, memoryview)
+            assert page == self.example_response
+            assert archive[1] == b"<html></html>"
+
+            data = InvoiceParser(html_text=page).data()
+            assert data["invoice_number"] == "QWERTYU1-QWERTYU1-12345"
+            fast = InvoiceParser(html_text=page, engine="fast").data()
+            assert fast == data
+
+            archive.save_index(self.path("pages.idx"))
+            entries = archive.entries
+            del page
+
+        with open_archive(self.path("pages.warc"), self.path("pages.idx")) as archive:
+            assert archive.entries == entries
+            assert [name for name, _ in archive] == [URL, "record-1"]
+
+    def test_tar(self):
+        """Test that plain tar members are read in place"""
+
+        path = self.write_tar(
+            "pages.tar", "w", {"a.html": self.example_response, "b.html": b"<p>"}
+        )
+        with open_archive(path) as archive:
+            assert isinstance(archive, TarArchive)
+            assert [entry.name for entry in archive.entries] == ["a.html", "b.html"]
+            assert isinstance(archive[0], memoryview)
+            assert archive[1] == b"<p>"
+
+            results = list(parse_many((page for _, page in archive), workers=2))
+            assert results[0].data["invoice_number"] == "QWERTYU1-QWERTYU1-12345"
+            assert not results[1].ok
+
+    def test_compressed_tar(self):
+        """Test streaming a gzip bundle and reading its members out of order"""
+
+        pages = {f"{number}.html": f"<p>{number}</p>".encode() for number in range(3)}
+        path = self.write_tar("pages.tar.gz", "w:gz", pages)
+
+        with TarArchive(path) as archive:
+            assert dict(iter(archive)) == pages
+            assert archive.entries[0] == ArchiveEntry("0.html", 512, 8)
+            assert archive[2] == b"<p>2</p>"
+            assert archive[0] == b"<p>0</p>"
+            archive.save_index(self.path("pages.idx"))
+
+        with TarArchive(path, index=self.path("pages.idx")) as archive:
+            assert archive[1] == b"<p>1</p>"
+            assert dict(iter(archive)) == pages
+
+    def test_incomplete_archive(self):
+        """Test that a reader without `read` and `close` can not be created"""
+
+        class IncompleteArchive(_Archive):
+            entries = []
+
+        with pytest.raises(TypeError, match="abstract"):
+            IncompleteArchive()
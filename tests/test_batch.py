@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from helpers import read_example_response
+
+from sr_invoice_parser.batch import BatchStats, parse_many
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+
+    def test_parse_many_in_process(self):
+        """Test that bad pages come back as error records without aborting"""
+
+        pages = [self.example_response, "Bad HTML content", self.example_response]
+        stats = BatchStats()
+        results = list(parse_many(pages, workers=1, chunksize=2, stats=stats))
+
+        assert [result.index for result in results] == [0, 1, 2]
+        assert results[0].ok
+        assert results[0].data["invoice_number"] == "QWERTYU1-QWERTYU1-12345"
+        assert not results[1].ok
+        assert "get_company_name" in results[1].error
+        assert results[2].data == results[0].data
+
+        assert stats.total == 3
+        assert stats.succeeded == 2
+        assert stats.failed == 1
+        assert stats.finished_at is not None
+
+    def test_parse_many_process_pool(self):
+        """Test that the process pool yields results in input order"""
+
+        pages = [self.example_response] * 5 + ["Bad HTML content"]
+        results = list(parse_many(pages, workers=2, chunksize=2))
+
+        assert [result.index for result in results] == list(range(6))
+        assert [result.ok for result in results] == [True] * 5 + [False]
+
+    def test_parse_many_unordered(self):
+        """Test that unordered mode returns every page exactly once"""
+
+        pages = [self.example_response] * 4
+        results = list(parse_many(pages, workers=2, chunksize=1, ordered=False))
+
+        assert sorted(result.index for result in results) == [0, 1, 2, 3]
@@ -0,0 +1,166 @@
+import gzip
+import os
+import tempfile
+from decimal import Decimal
+from unittest import TestCase, mock
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.cache import (
+    CacheEntry,
+    FileSystemCache,
+    MemoryCache,
+    ResponseCache,
+    cache_key,
+    is_final,
+)
+from sr_invoice_parser.parser import InvoiceParser
+
+URL = "https://suf.purs.gov.rs/v/?vl=QUJD"
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def create_success_mock_response(self):
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.text = self.example_response.decode("utf-8")
+        mock_response.content = self.example_response
+        return mock_response
+
+    def test_cache_key(self):
+        """Test that the key only depends on the `vl` parameter"""
+
+        assert cache_key(URL) == cache_key("https://suf.purs.gov.rs/v?vl=%51UJD&x=1")
+        assert cache_key(URL) != cache_key("https://suf.purs.gov.rs/v/?vl=QUJE")
+
+        # the same token written with `+`, `%2B`, URL-safe base64 or padding
+        keys = {
+            cache_key(f"https://suf.purs.gov.rs/v/?vl={token}")
+            for token in ("AB+C/D==", "AB%2BC/D", "AB-C_D", "AB%2BC%2FD%3D%3D")
+        }
+        assert len(keys) == 1
+
+    def test_memory_cache_eviction(self):
+        """Test that the least recently used entries are evicted first"""
+
+        cache = MemoryCache(max_bytes=10)
+        cache.set("a", CacheEntry(content=b"aaaa"))
+        cache.set("b", CacheEntry(content=b"bbbb"))
+        cache.get("a")
+        cache.set("c", CacheEntry(content=b"cccc"))
+
+        assert list(cache.entries) == ["a", "c"]
+        assert cache.size == 8
+
+    def test_file_system_cache(self):
+        for compression in (None, "gzip"):
+            cache = FileSystemCache(self.directory.name, compression=compression)
+            key = cache_key(URL)
+            cache.set(key, CacheEntry(content=b"page\nend", data={"a": "1\n2"}))
+
+            assert os.path.exists(os.path.join(self.directory.name, key[:2], key[2:4]))
+            assert cache.get(key).content == b"page\nend"
+            assert cache.get(key).data == {"a": "1\n2"}
+
+            cache.delete(key)
+            assert cache.get(key) is None
+
+        # files in another format, e.g. pickled entries, are misses
+        blobs = (
+            b"\x80\x04\x95 not json",
+            b"[1, 2]\n\npage",
+            gzip.compress(b"[1, 2]\n\npage"),
+            gzip.compress(b"page")[:10],
+        )
+        for compression in (None, "gzip"):
+            cache = FileSystemCache(self.directory.name, compression=compression)
+            for blob in blobs:
+                with open(cache.path(key), "wb") as file:
+                    file.write(blob)
+                assert cache.get(key) is None
+
+        with pytest.raises(ValueError, match="Unknown compression 'lz4'"):
+            FileSystemCache(self.directory.name, compression="lz4")
+
+    @mock.patch("sr_invoice_parser.cache.time.time")
+    def test_ttl(self, mock_time):
+        """Test that only pages of unverified invoices expire"""
+
+        mock_time.return_value = 1000.0
+        cache = ResponseCache(ttl=60)
+        cache.set(URL, b"pending")
+        cache.set(URL + "final", self.example_response)
+
+        mock_time.return_value = 1100.0
+        assert cache.get(URL) is None
+        assert cache.get(URL + "final").content == self.example_response
+
+    def test_is_final(self):
+        """Test that only the status label marks a page as final"""
+
+        assert is_final(self.example_response)
+        pending = self.example_response.replace(
+            "Рачун је проверен</label>".encode(), "Рачун се обрађује</label>".encode()
+        )
+        assert not is_final(pending)
+        # the final status elsewhere on a pending page does not count
+        assert not is_final(pending + "<script>'Рачун је проверен'</script>".encode())
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_parser_cache_hit(self, mock_get):
+        """Test that a hit skips both the network and parsing"""
+
+        mock_get.return_value = self.create_success_mock_response()
+        cache = ResponseCache(backend=FileSystemCache(self.directory.name, "gzip"))
+
+        expected = InvoiceParser(url=URL, cache=cache).data()
+        mock_get.assert_called_once()
+
+        # a fresh memory tier forces a read from the filesystem backend
+        cache = ResponseCache(backend=FileSystemCache(self.directory.name, "gzip"))
+        with mock.patch.object(InvoiceParser, "get_html_selector") as selector:
+            parser = InvoiceParser(url=URL, cache=cache)
+            selector.assert_not_called()
+        with mock.patch.object(parser, "get_items") as get_items:
+            assert parser.data() == expected
+            assert parser.data(fields=["invoice_number"]) == {
+                "invoice_number": expected["invoice_number"]
+            }
+            get_items.assert_not_called()
+        mock_get.assert_called_once()
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_parser_cache_amount_type(self, mock_get):
+        """Test that cached results are only reused with the same amount type"""
+
+        mock_get.return_value = self.create_success_mock_response()
+        cache = ResponseCache()
+        InvoiceParser(url=URL, cache=cache).data()
+
+        parser = InvoiceParser(url=URL, cache=cache, amount_type="decimal")
+        assert parser.data()["invoice_total_amount"] == Decimal("8960.00")
+        mock_get.assert_called_once()
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_parser_cache_journal_format(self, mock_get):
+        """Test that a cached HTML journal is not returned as plain text"""
+
+        mock_get.return_value = self.create_success_mock_response()
+        cache = ResponseCache()
+        InvoiceParser(url=URL, cache=cache).data()
+
+        parser = InvoiceParser(url=URL, cache=cache, journal_format="text")
+        text = parser.data()["invoice_text"]
+        assert text.startswith("============ ФИСКАЛНИ РАЧУН")
+        assert "<img" not in text
+        mock_get.assert_called_once()
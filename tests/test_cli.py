@@ -0,0 +1,147 @@
+import glob
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase, mock
+
+from helpers import LocalServer, read_example_response
+
+from sr_invoice_parser.cli import Checkpoint, iter_glob, iter_sources, main
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails the first request of every path with a 503, then serves the page"""
+
+    seen = set()
+
+    def do_GET(self):
+        if self.path not in self.seen:
+            self.seen.add(self.path)
+            body, status = b"", 503
+        else:
+            body, status = read_example_response(), 200
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCli(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        example_response = read_example_response()
+        for name in ("a", "b", "c"):
+            with open(os.path.join(self.directory.name, f"{name}.html"), "wb") as file:
+                file.write(example_response)
+        with open(os.path.join(self.directory.name, "bad.html"), "w") as file:
+            file.write("Bad HTML content")
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def run_main(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output), mock.patch("sys.stderr", io.StringIO()):
+            assert main(list(argv)) == 0
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_glob(self):
+        """Test that every matching file produces one JSON line"""
+
+        results = self.run_main(
+            "--glob",
+            os.path.join(self.directory.name, "*.html"),
+            "--workers",
+            "2",
+            "--fields",
+            "invoice_number,invoice_datetime",
+        )
+
+        assert len(results) == 4
+        errors = [result for result in results if "error" in result]
+        assert len(errors) == 1
+        assert errors[0]["source"].endswith("bad.html")
+        ok = [result for result in results if "error" not in result]
+        assert ok[0]["invoice_number"] == "QWERTYU1-QWERTYU1-12345"
+        assert ok[0]["invoice_datetime"] == "2024-04-07T15:00:30+00:00"
+        assert set(ok[0]) == {"source", "invoice_number", "invoice_datetime"}
+
+    def test_resume(self):
+        """Test that a resumed run skips sources finished by the previous run"""
+
+        sources = os.path.join(self.directory.name, "sources.txt")
+        with open(sources, "w") as file:
+            for name in ("a", "b", "c"):
+                file.write(os.path.join(self.directory.name, f"{name}.html") + "\n")
+        checkpoint = os.path.join(self.directory.name, "checkpoint")
+        with open(checkpoint, "w") as file:
+            file.write("2")
+
+        results = self.run_main("--input", sources, "--resume", checkpoint)
+
+        assert [result["source"][-6:] for result in results] == ["c.html"]
+        assert Checkpoint(checkpoint).position == 3
+
+    def test_glob_order(self):
+        """Test that globbed files come in a stable order for resuming"""
+
+        pattern = os.path.join(self.directory.name, "*.html")
+        options = mock.Mock(glob=[pattern], input=None)
+        names = [os.path.basename(path) for path in iter_sources(options)]
+        assert names == ["a.html", "b.html", "bad.html", "c.html"]
+
+    def test_glob_recursive(self):
+        """Test that recursive patterns match what glob does, walked in order"""
+
+        root = self.directory.name
+        for name in ("x/b.html", "x/a.html", "x/y/c.html", ".hidden/d.html"):
+            path = os.path.join(root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+        pattern = os.path.join(root, "**", "*.html")
+        paths = list(iter_glob(pattern))
+        assert sorted(paths) == sorted(glob.glob(pattern, recursive=True))
+        assert [os.path.relpath(path, root) for path in paths] == [
+            "a.html",
+            "b.html",
+            "bad.html",
+            "c.html",
+            os.path.join("x", "a.html"),
+            os.path.join("x", "b.html"),
+            os.path.join("x", "y", "c.html"),
+        ]
+
+    def test_urls(self):
+        """Test that URLs are fetched through the shared retrying session"""
+
+        FlakyHandler.seen = set()
+        sources = os.path.join(self.directory.name, "urls.txt")
+        with LocalServer(FlakyHandler) as server:
+            with open(sources, "w") as file:
+                file.write(f"{server.url('/v/?vl=1')}\n{server.url('/v/?vl=2')}\n")
+            with mock.patch.object(InvoiceParser, "ALLOWED_DOMAINS", [server.host]):
+                results = self.run_main(
+                    "--input", sources, "--fields", "invoice_number"
+                )
+
+        assert [result["invoice_number"] for result in results] == [
+            "QWERTYU1-QWERTYU1-12345"
+        ] * 2
+
+    def test_checkpoint_waits_for_earlier_sources(self):
+        checkpoint = Checkpoint(None)
+        checkpoint.complete(1)
+        assert checkpoint.position == 0
+        checkpoint.complete(0)
+        assert checkpoint.position == 2
+        assert checkpoint.done == set()
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from benchmarks.corpus import format_amount, generate_corpus, generate_page
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class TestCorpus(TestCase):
+    def test_format_amount(self):
+        assert format_amount(896000) == "8.960,00"
+        assert format_amount(5) == "0,05"
+
+    def test_generated_page_parses(self):
+        """Test that generated pages parse to the generated number of items"""
+
+        for line_ending in ("\n", "\r\n"):
+            page = generate_page(120, seed=7, line_ending=line_ending)
+            data = InvoiceParser(html_text=page).data()
+
+            assert len(data["invoice_items"]) == 120
+            assert (
+                round(sum(item["total_price"] for item in data["invoice_items"]), 2)
+                == data["invoice_total_amount"]
+            )
+
+    def test_generate_corpus(self):
+        pages = list(generate_corpus(3, items=2))
+        assert len(pages) == 3
+        assert b"\r\n" in pages[1] and b"\r\n" not in pages[0]
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+import pytest
+from pytz import utc
+
+from sr_invoice_parser.datetimes import DATETIME_FORMAT, to_utc, to_utc_epochs
+
+
+class TestDatetimes(TestCase):
+    def test_to_utc(self):
+        assert to_utc("07.04.2024. 17:00:30") == datetime(
+            2024, 4, 7, 15, 0, 30
+        ).replace(tzinfo=utc)
+        assert to_utc("07.01.2024. 17:00:30") == datetime(
+            2024, 1, 7, 16, 0, 30
+        ).replace(tzinfo=utc)
+
+    def test_to_utc_epochs_matches_to_utc(self):
+        """Test the batch path against `to_utc`, including both DST transitions"""
+
+        values = []
+        for start in (datetime(2024, 3, 30, 22), datetime(2024, 10, 26, 22)):
+            for minutes in range(0, 8 * 60, 7):
+                dt = start + timedelta(minutes=minutes)
+                values.append(dt.strftime(DATETIME_FORMAT))
+
+        expected = [int(to_utc(value).timestamp()) for value in values]
+        assert to_utc_epochs(values) == expected
+
+    def test_to_utc_epochs_invalid(self):
+        with pytest.raises(ValueError, match="does not match format"):
+            to_utc_epochs(["2024-04-07 17:00:30"])
@@ -0,0 +1,181 @@
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase
+
+import pytest
+from helpers import LocalServer, read_example_response
+
+from sr_invoice_parser.exceptions import ParserParseException, ParserRequestException
+from sr_invoice_parser.fast import JOURNAL_ID, SPAN_IDS, read_page, scan_anchors
+from sr_invoice_parser.metrics import Metrics
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class TestFastParity(TestCase):
+    """The fast engine must return exactly what the DOM engine returns"""
+
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+
+    def assert_parity(self, html_text):
+        dom = InvoiceParser(html_text=html_text).data()
+        fast = InvoiceParser(html_text=html_text, engine="fast").data()
+        assert fast == dom
+
+    def test_scan_anchors(self):
+        """Test that the scanner finds every anchor on the example page"""
+
+        anchors = scan_anchors(self.example_response)
+        assert set(anchors) == set(SPAN_IDS) | {JOURNAL_ID}
+        assert anchors["tinLabel"].strip() == "123456789"
+
+    def test_fast_engine_skips_dom(self):
+        """Test that the DOM is not built when every anchor is found"""
+
+        parser = InvoiceParser(html_text=self.example_response, engine="fast")
+        parser.data()
+        assert "html_selector" not in parser.__dict__
+
+    def test_parity_bytes(self):
+        self.assert_parity(self.example_response)
+
+    def test_parity_text(self):
+        self.assert_parity(self.example_response.decode("utf-8"))
+
+    def test_parity_crlf(self):
+        self.assert_parity(self.example_response.replace(b"\n", b"\r\n"))
+
+    def test_parity_entities(self):
+        self.assert_parity(
+            self.example_response.replace(
+                b"Primer naziva firme", b"Primer &amp; naziva&nbsp;firme"
+            )
+        )
+
+    def test_parity_single_quoted_ids(self):
+        self.assert_parity(
+            self.example_response.replace(
+                b'id="invoiceNumberLabel"', b"id='invoiceNumberLabel' class=\"x\""
+            )
+        )
+
+    def test_missing_anchor_falls_back(self):
+        """Test that a missing anchor falls back to the DOM"""
+
+        html_text = self.example_response.replace(
+            b'<span id="tinLabel">', b'<span class="x"><span id="other">'
+        )
+        assert "tinLabel" not in scan_anchors(html_text)
+        with pytest.raises(ParserParseException, match="get_company_tin"):
+            InvoiceParser(html_text=html_text, engine="fast").get_company_tin()
+
+    def test_ambiguous_anchor_falls_back(self):
+        """Test that a repeated anchor falls back to the DOM"""
+
+        html_text = self.example_response.replace(
+            b"<body", b'<span id="shopFullNameLabel">Other</span><body', 1
+        )
+        assert "shopFullNameLabel" not in scan_anchors(html_text)
+        self.assert_parity(html_text)
+
+    def test_nested_anchor_falls_back(self):
+        """Test that an anchor without plain text falls back to the DOM"""
+
+        html_text = self.example_response.replace(
+            b'<span id="shopFullNameLabel">Primer naziva firme</span>',
+            b'<span id="shopFullNameLabel"><b>Primer</b> naziva firme</span>',
+        )
+        assert "shopFullNameLabel" not in scan_anchors(html_text)
+        self.assert_parity(html_text)
+
+    def test_bad_html(self):
+        with pytest.raises(ParserParseException, match="get_company_name"):
+            InvoiceParser(html_text="Bad HTML content", engine="fast").data()
+
+    def test_unknown_engine(self):
+        with pytest.raises(ParserParseException, match="Unknown engine 'soup'"):
+            InvoiceParser(html_text=self.example_response, engine="soup")
+
+
+def chunked(content, size):
+    return (content[i : i + size] for i in range(0, len(content), size))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the example page followed by a large padding"""
+
+    padding = b"<!--" + b"x" * 1024 * 1024 + b"-->"
+
+    def do_GET(self):
+        body = read_example_response().replace(b"</body>", self.padding + b"</body>")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client stopped reading after the journal
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class TestReadPage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+
+    def test_stops_after_journal(self):
+        """Test that reading stops at the journal and parses the same"""
+
+        for size in (1, 7, 100, 64 * 1024):
+            content = read_page(chunked(self.example_response, size))
+            assert content.endswith(b"</pre>")
+            assert len(content) < len(self.example_response)
+            assert (
+                InvoiceParser(html_text=content).data()
+                == InvoiceParser(html_text=self.example_response).data()
+            )
+
+    def test_label_after_journal(self):
+        """Test that the whole page is read when a label follows the journal"""
+
+        start = self.example_response.index(b'<span id="tinLabel"')
+        end = self.example_response.index(b"</span>", start) + len(b"</span>")
+        label = self.example_response[start:end]
+        html_text = self.example_response.replace(label, b"").replace(
+            b"</body>", label + b"</body>"
+        )
+        assert read_page(chunked(html_text, 100)) == html_text
+
+    def test_no_stop_early(self):
+        content = read_page(chunked(self.example_response, 100), stop_early=False)
+        assert content == self.example_response
+
+    def test_max_bytes(self):
+        with pytest.raises(ParserRequestException, match="larger than 1000 bytes"):
+            read_page(chunked(self.example_response, 100), max_bytes=1000)
+
+    def test_streamed_fetch(self):
+        """Test that a streamed fetch downloads less and parses the same"""
+
+        with LocalServer(StubHandler) as server:
+
+            class StubParser(InvoiceParser):
+                ALLOWED_DOMAINS = [server.host]
+
+            url = server.url("/v/?vl=1")
+            metrics = Metrics()
+            parser = StubParser(url=url, stream=True, metrics=metrics)
+            assert parser.data() == StubParser(url=url).data()
+            [fetched] = metrics.to_dict()["counters"]["fetch_bytes"].values()
+            assert fetched < len(StubHandler.padding)
+
+            with pytest.raises(ParserRequestException, match="larger than"):
+                StubParser(url=url, stream=True, max_bytes=64 * 1024)
+            # the cap holds without `stream` too
+            with pytest.raises(ParserRequestException, match="larger than"):
+                StubParser(url=url, max_bytes=64 * 1024)
+            parser = StubParser(url=url, max_bytes=2 * 1024 * 1024)
+            assert parser.html_text.endswith(b"</body>\n")
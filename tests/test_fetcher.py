@@ -0,0 +1,152 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase, mock
+
+import pytest
+import requests
+from helpers import read_example_response
+
+from sr_invoice_parser.exceptions import ParserRequestException
+from sr_invoice_parser.fetcher import AsyncInvoiceFetcher
+from sr_invoice_parser.metrics import Metrics
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves the example page, failing `/flaky` once and `/missing` always.
+
+    `/truncated` is cut short once and `/loop` redirects to itself.
+    """
+
+    hits = {}
+
+    def do_GET(self):
+        self.hits[self.path] = self.hits.get(self.path, 0) + 1
+
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/flaky" and self.hits[self.path] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if self.path == "/loop":
+            self.send_response(302)
+            self.send_header("Location", "/loop")
+            self.end_headers()
+            return
+
+        body = read_example_response()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path == "/truncated" and self.hits[self.path] == 1:
+            body = body[:100]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncInvoiceFetcher(TestCase):
+    @pytest.fixture(autouse=True)
+    def start_server(self, serve):
+        self.host = serve(StubHandler).host
+
+    def setUp(self):
+        super().setUp()
+        StubHandler.hits = {}
+
+    def fetcher(self, **kwargs):
+        return AsyncInvoiceFetcher(allowed_domains=[self.host], backoff=0, **kwargs)
+
+    def test_validate_url(self):
+        """Test that the domain allow-list is enforced before any request"""
+
+        async def run():
+            async with AsyncInvoiceFetcher() as fetcher:
+                await fetcher.fetch("https://example.com/v/?vl=")
+
+        with pytest.raises(ParserRequestException, match="Invalid domain"):
+            asyncio.run(run())
+
+    def test_fetch_many(self):
+        """Test fetching several pages, retrying a 5xx and reporting a 404"""
+
+        urls = [
+            f"http://{self.host}/v/?vl=1",
+            f"http://{self.host}/flaky",
+            f"http://{self.host}/missing",
+        ]
+
+        metrics = Metrics()
+
+        async def run():
+            async with self.fetcher(limit_per_host=2, metrics=metrics) as fetcher:
+                return await fetcher.fetch_many(urls)
+
+        results = asyncio.run(run())
+
+        assert [result.url for result in results] == urls
+        assert results[0].ok
+        parser = InvoiceParser(html_text=results[0].content)
+        assert parser.get_invoice_number() == "QWERTYU1-QWERTYU1-12345"
+
+        assert results[1].ok
+        assert StubHandler.hits["/flaky"] == 2
+
+        assert not results[2].ok
+        assert results[2].error == "Request failed with status code 404"
+        assert StubHandler.hits["/missing"] == 1
+
+        counters = metrics.to_dict()["counters"]
+        assert counters["fetch_retries"] == {"": 1}
+        assert counters["fetch_responses"] == {
+            "status=200": 2,
+            "status=503": 1,
+            "status=404": 1,
+        }
+
+    def test_fetch_gives_up_after_retries(self):
+        """Test that connection failures are retried and then surfaced as errors"""
+
+        async def run():
+            async with self.fetcher(retries=1) as fetcher:
+                # nothing listens on port 9 so every attempt fails to connect
+                fetcher.allowed_domains.append("127.0.0.1:9")
+                await fetcher.fetch("http://127.0.0.1:9/")
+
+        with pytest.raises(ParserRequestException, match="Request failed"):
+            asyncio.run(run())
+
+    def test_fetch_many_request_errors(self):
+        """Test that other request errors are retried or reported per URL"""
+
+        urls = [f"http://{self.host}/truncated", f"http://{self.host}/loop"]
+
+        async def run():
+            async with self.fetcher() as fetcher:
+                return await fetcher.fetch_many(urls)
+
+        truncated, loop = asyncio.run(run())
+
+        assert truncated.ok
+        assert StubHandler.hits["/truncated"] == 2
+        assert not loop.ok
+        assert "redirects" in loop.error
+
+    def test_close_keeps_given_session(self):
+        """Test that only a session created by the fetcher is closed"""
+
+        session = requests.Session()
+        with mock.patch.object(session, "close") as close:
+            AsyncInvoiceFetcher(session=session).close()
+            close.assert_not_called()
+
+        fetcher = AsyncInvoiceFetcher()
+        with mock.patch.object(fetcher.session, "close") as close:
+            fetcher.close()
+            close.assert_called_once()
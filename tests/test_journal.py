@@ -0,0 +1,216 @@
+from unittest import TestCase
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.exceptions import ParserParseException
+from sr_invoice_parser.journal import (
+    Payment,
+    TaxRow,
+    find_qr_image,
+    items_section,
+    iter_item_rows,
+    journal_text,
+    split_item_name,
+    vat_rates,
+)
+from sr_invoice_parser.parser import InvoiceParser
+
+# a 1x1 GIF, as inlined in the journal of real pages
+GIF = "R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+QR_JOURNAL = f"""<pre style="font-family:monospace">ПФР број рачуна: A-B-1
+Бројач рачуна: 1/1ПП &amp; 2
+========================================<br/><img src="data:image/gif;base64,{GIF}" width='250' height='250'/>
+======== КРАЈ ФИСКАЛНОГ РАЧУНА =========</pre>"""
+
+JOURNAL = """============ ФИСКАЛНИ РАЧУН ============
+Артикли
+========================================
+Назив   Цена         Кол.         Укупно
+Hleb   beli 500g (Е)
+    65,00          2       130,00
+Veoma dugačak naziv artikla za testiranj
+e (Ђ)
+    1.000,00          1       1.000,00
+----------------------------------------
+Укупан износ:                   1.130,00
+========================================"""
+
+
+class TestJournal(TestCase):
+    def test_iter_item_rows(self):
+        assert list(iter_item_rows(JOURNAL)) == [
+            ("Hleb beli 500g (Е)", "65,00", "2", "130,00"),
+            (
+                "Veoma dugačak naziv artikla za testiranje (Ђ)",
+                "1.000,00",
+                "1",
+                "1.000,00",
+            ),
+        ]
+
+    def test_iter_item_rows_crlf(self):
+        assert list(iter_item_rows(JOURNAL.replace("\n", "\r\n"))) == list(
+            iter_item_rows(JOURNAL)
+        )
+
+    def test_unfinished_item(self):
+        """Test that a name without a price line is still yielded"""
+
+        journal = JOURNAL.replace("    1.000,00          1       1.000,00\n", "")
+        assert list(iter_item_rows(journal))[-1] == (
+            "Veoma dugačak naziv artikla za testiranje (Ђ)",
+            None,
+            None,
+            None,
+        )
+
+    def test_items_section_missing(self):
+        with pytest.raises(
+            ParserParseException, match="Items section not found in the journal"
+        ):
+            items_section("no journal here")
+
+    def test_iter_items(self):
+        """Test that items are yielded lazily as parsed dictionaries"""
+
+        parser = InvoiceParser(html_text="<pre></pre>", lazy=True)
+        items = parser.iter_items(JOURNAL)
+
+        assert next(items) == {
+            "name": "Hleb beli 500g",
+            "vat": 10,
+            "price": 65.0,
+            "quantity": 2,
+            "total_price": 130.0,
+        }
+        assert next(items)["name"] == "Veoma dugačak naziv artikla za testiranje"
+        assert next(items, None) is None
+
+    def test_parse_journal(self):
+        """Test that every journal section is parsed in one pass"""
+
+        parser = InvoiceParser(html_text=read_example_response())
+        journal = parser.parse_journal()
+
+        assert journal.header.tin == "123456789"
+        assert journal.header.cashier == "prodavac1"
+        assert journal.header.buyer_id == "10:987654321"
+        assert journal.header.esir_number == "644/20.1"
+        assert journal.header.transaction_type == "ПРОМЕТ ПРОДАЈА"
+        assert journal.items == parser.get_items()
+        assert journal.total_amount == 8960.0
+        assert journal.payments == [Payment(method="Платна картица", amount=8960.0)]
+        assert journal.taxes[0] == TaxRow(
+            label="Ђ", name="О-ПДВ", rate=20.0, amount=500.0
+        )
+        assert len(journal.taxes) == 4
+        assert journal.total_tax == 696.0
+        assert journal.footer.pfr_time == "07.04.2024. 17:00:30"
+        assert journal.footer.invoice_number == "QWERTY1U-QWERTY1U-188553"
+        assert journal.footer.invoice_counter == "175097/188553ПП"
+
+    def test_fractional_quantities(self):
+        """Test that weighed goods do not leak into the next item name"""
+
+        journal = JOURNAL.replace(
+            "    65,00          2       130,00",
+            "   189,99      0,456 kg        86,64\nJabuka (Е)\n    99,99      1,5        149,99",
+        )
+        parser = InvoiceParser(html_text="<pre></pre>", lazy=True)
+        items = list(parser.iter_items(journal))
+
+        assert [item["name"] for item in items] == [
+            "Hleb beli 500g",
+            "Jabuka",
+            "Veoma dugačak naziv artikla za testiranje",
+        ]
+        assert items[0]["quantity"] == 0.456
+        assert items[0]["total_price"] == 86.64
+        assert items[1]["quantity"] == 1.5
+        assert items[2]["quantity"] == 1
+
+    def test_strict(self):
+        """Test that strict mode rejects lines whose totals do not add up"""
+
+        parser = InvoiceParser(html_text="<pre></pre>", lazy=True, strict=True)
+        assert len(list(parser.iter_items(JOURNAL))) == 2
+
+        journal = JOURNAL.replace("       130,00", "       131,00")
+        with pytest.raises(
+            ParserParseException,
+            match=r"Item 'Hleb beli 500g' total 131.0 does not match price 65.0 \* quantity 2",
+        ):
+            list(parser.iter_items(journal))
+
+        journal = JOURNAL.replace("    1.000,00          1       1.000,00\n", "")
+        with pytest.raises(ParserParseException, match="has no price line"):
+            list(parser.iter_items(journal))
+
+    def test_split_item_name(self):
+        """Test that names are transliterated and their VAT label split off"""
+
+        assert split_item_name("Хлеб бели (Ђ)") == ("Hleb beli", "đ")
+        assert split_item_name("Jabuka (A) ") == ("Jabuka", "a")
+        assert split_item_name("Џем") == ("Džem", None)
+
+    def test_vat_rates(self):
+        """Test that VAT rates are read from the tax table of the journal"""
+
+        assert vat_rates(JOURNAL) == {"a": 0, "e": 10, "g": 0, "đ": 20}
+
+        text = read_example_response().decode()
+        assert vat_rates(text.replace("10,00%", "12,50%"))["e"] == 12.5
+
+        journal = (
+            JOURNAL + "\nОзнака       Име      Стопа        Порез\n"
+            "Е           О-ПДВ    8,00%         9,63\n"
+            "----------------------------------------"
+        )
+        parser = InvoiceParser(html_text="<pre></pre>", lazy=True)
+        items = list(parser.iter_items(journal))
+        assert [item["vat"] for item in items] == [8, 20]
+
+    def test_journal_text(self):
+        """Test that markup is removed and the QR image dropped or referenced"""
+
+        assert journal_text(QR_JOURNAL) == (
+            "ПФР број рачуна: A-B-1\n"
+            "Бројач рачуна: 1/1ПП & 2\n"
+            "========================================\n"
+            "======== КРАЈ ФИСКАЛНОГ РАЧУНА ========="
+        )
+        assert journal_text(QR_JOURNAL, "[QR]").splitlines()[-2:] == [
+            "[QR]",
+            "======== КРАЈ ФИСКАЛНОГ РАЧУНА =========",
+        ]
+
+    def test_find_qr_image(self):
+        """Test that the QR image is found and decoded only on demand"""
+
+        image = find_qr_image(QR_JOURNAL)
+        assert (image.media_type, image.encoded) == ("image/gif", GIF)
+        assert "data" not in image.__dict__
+        assert image.data.startswith(b"GIF89a")
+
+        # the example page inlines an empty image
+        assert find_qr_image(read_example_response().decode()) is None
+
+        image = find_qr_image(QR_JOURNAL.replace(GIF, "not*base64"))
+        with pytest.raises(ParserParseException, match="Invalid journal image"):
+            image.data
+
+    def test_journal_formats(self):
+        """Test that the plain text journals parse to the same items"""
+
+        html_text = read_example_response()
+        html = InvoiceParser(html_text=html_text).data()
+        for journal_format in ("text", "reference"):
+            parser = InvoiceParser(html_text=html_text, journal_format=journal_format)
+            data = parser.data()
+            assert "<" not in data.pop("invoice_text")
+            assert data == {k: v for k, v in html.items() if k != "invoice_text"}
+        assert parser.invoice_text.splitlines()[-2] == InvoiceParser.QR_REFERENCE
+
+        with pytest.raises(ParserParseException, match="Unknown journal format"):
+            InvoiceParser(html_text=html_text, journal_format="pdf")
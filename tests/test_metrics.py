@@ -0,0 +1,61 @@
+from unittest import TestCase, mock
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.exceptions import ParserParseException
+from sr_invoice_parser.metrics import Metrics
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_parser_stages(self, mock_get):
+        """Test that fetch, every field and failures are recorded"""
+
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.text = self.example_response
+        mock_get.return_value = mock_response
+
+        metrics = Metrics()
+        InvoiceParser(url="https://suf.purs.gov.rs/v/vl?", metrics=metrics).data()
+        with pytest.raises(ParserParseException):
+            InvoiceParser(html_text="Bad HTML content", metrics=metrics).data()
+
+        result = metrics.to_dict()
+        assert result["stages"]["fetch"]["ok"]["count"] == 1
+        assert result["stages"]["get_dt"]["ok"]["count"] == 1
+        assert result["stages"]["get_items"]["ok"]["count"] == 1
+        assert result["stages"]["get_company_name"]["error"]["count"] == 1
+        assert result["counters"]["fetch_responses"] == {"status=200": 1}
+
+    def test_openmetrics(self):
+        metrics = Metrics()
+        metrics.observe("get_dt", 0.5)
+        metrics.observe("get_dt", 0.25)
+        metrics.increment("fetch_responses", status=503)
+        metrics.increment("fetch_retries")
+
+        assert metrics.to_openmetrics() == (
+            "# TYPE sr_invoice_parser_stage_seconds summary\n"
+            "# UNIT sr_invoice_parser_stage_seconds seconds\n"
+            'sr_invoice_parser_stage_seconds_count{stage="get_dt",outcome="ok"} 2\n'
+            'sr_invoice_parser_stage_seconds_sum{stage="get_dt",outcome="ok"} 0.75\n'
+            "# TYPE sr_invoice_parser_fetch_responses counter\n"
+            'sr_invoice_parser_fetch_responses_total{status="503"} 1\n'
+            "# TYPE sr_invoice_parser_fetch_retries counter\n"
+            "sr_invoice_parser_fetch_retries_total 1\n"
+            "# EOF\n"
+        )
+
+    def test_disabled(self):
+        """Test that parsers without metrics record nothing"""
+
+        parser = InvoiceParser(html_text=self.example_response)
+        assert parser.metrics is None
+        assert parser.get_company_tin() == "123456789"
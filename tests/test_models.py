@@ -0,0 +1,71 @@
+from decimal import Decimal
+from unittest import TestCase
+
+import pytest
+from helpers import read_example_response
+
+from sr_invoice_parser.models import (
+    Invoice,
+    InvoiceItem,
+    dumps,
+    loads,
+    loads_with_options,
+)
+from sr_invoice_parser.parser import InvoiceParser
+
+
+class TestModels(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.parser = InvoiceParser(html_text=read_example_response())
+
+    def test_round_trip(self):
+        """Test that the model converts back to the exact `data()` output"""
+
+        invoice = self.parser.get_invoice()
+
+        assert isinstance(invoice.invoice_items[0], InvoiceItem)
+        assert invoice.invoice_items[2].vat == 10
+        assert invoice.to_dict() == self.parser.data()
+        assert Invoice.from_json(invoice.to_json()) == invoice
+
+    def test_loads_decimal(self):
+        """Test that `Decimal` amounts are restored when the options say so"""
+
+        data = InvoiceParser(
+            html_text=read_example_response(), amount_type="decimal"
+        ).data()
+        options = {
+            "amount_type": "decimal",
+            "journal_format": "html",
+            "specifications": False,
+            "strict": False,
+        }
+        text = dumps(data, options)
+
+        assert loads_with_options(text) == (data, options)
+        assert loads(dumps(data))["invoice_total_amount"] == "8960.00"
+
+    def test_round_trip_decimal(self):
+        """Test that `Decimal` amounts survive the JSON round trip"""
+
+        invoice = InvoiceParser(
+            html_text=read_example_response(), amount_type="decimal"
+        ).get_invoice()
+
+        assert isinstance(invoice.invoice_total_amount, Decimal)
+        assert Invoice.from_json(invoice.to_json()) == invoice
+
+    def test_without_text(self):
+        invoice = self.parser.get_invoice(include_text=False)
+
+        assert invoice.invoice_text is None
+        assert invoice.invoice_number == "QWERTYU1-QWERTYU1-12345"
+
+    def test_slots(self):
+        """Test that instances carry no per-instance dictionary"""
+
+        item = self.parser.get_invoice().invoice_items[0]
+        assert not hasattr(item, "__dict__")
+        with pytest.raises(AttributeError):
+            item.unknown = 1
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from datetime import datetime
 from unittest import TestCase, mock
@@ -524,3 +525,114 @@ G           О-ПДВ    0,00%          0,00
         # test with HTML content
         parser = InvoiceParser(html_text=self.example_response)
         assert parser.data() == value
+
+    def test_get_data_fields(self):
+        """Test that data() only computes the requested fields"""
+
+        parser = InvoiceParser(html_text=self.example_response)
+        with mock.patch.object(
+            parser, "get_items", wraps=parser.get_items
+        ) as get_items:
+            value = parser.data(fields=["invoice_number", "invoice_total_amount"])
+            get_items.assert_not_called()
+
+        assert value == {
+            "invoice_number": "QWERTYU1-QWERTYU1-12345",
+            "invoice_total_amount": 8960.0,
+        }
+
+        with pytest.raises(ParserParseException, match="Unknown fields: foo"):
+            parser.data(fields=["invoice_number", "foo"])
+
+    def test_fields_are_cached(self):
+        """Test that each field is computed once per parser"""
+
+        parser = InvoiceParser(html_text=self.example_response)
+        with mock.patch.object(
+            parser, "get_invoice_text", wraps=parser.get_invoice_text
+        ) as get_invoice_text:
+            parser.data()
+            parser.data()
+            parser.get_items()
+            assert parser.invoice_items == parser.get_items()
+            get_invoice_text.assert_called_once()
+
+    def test_get_fields(self):
+        """Test that every labelled span is read in a single traversal"""
+
+        parser = InvoiceParser(html_text=self.example_response)
+        with mock.patch.object(
+            parser, "get_fields", wraps=parser.get_fields
+        ) as get_fields:
+            parser.data(fields=["company_name", "company_tin", "invoice_number"])
+            get_fields.assert_called_once()
+
+        fields = parser.get_fields()
+        assert fields["addressLabel"] == "Кнеза Михаила"
+        assert fields["cityLabel"] == "БЕОГРАД"
+        assert fields["transactionTypeCounterLabel"] == "175097"
+        assert fields["invoiceCounterExtensionLabel"] == "ПП"
+        assert fields["transactionTypeId"] == "Продаја"
+        assert fields["invoiceStatusLabel"] == "Рачун је проверен"
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_lazy_fetch(self, mock_get):
+        """Test that a lazy parser fetches on first field access"""
+
+        mock_get.return_value = self.create_success_mock_response()
+
+        parser = InvoiceParser(url="https://suf.purs.gov.rs/v/vl?", lazy=True)
+        parser.validate_url()
+        mock_get.assert_not_called()
+
+        assert parser.get_company_name() == "Primer naziva firme"
+        assert parser.get_company_tin() == "123456789"
+        mock_get.assert_called_once_with("https://suf.purs.gov.rs/v/vl?")
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_lazy_fetch_failed(self, mock_get):
+        """Test that request errors are not turned into parse errors"""
+
+        mock_response = mock.Mock()
+        mock_response.status_code = 500
+        mock_get.return_value = mock_response
+
+        parser = InvoiceParser(url="https://suf.purs.gov.rs/v/vl?", lazy=True)
+        with pytest.raises(
+            ParserRequestException, match="Request failed with status code 500"
+        ):
+            parser.get_company_name()
+
+    def test_lazy_fetch_connection_error(self):
+        """Test that a failed connection is a request error, not a parse error"""
+
+        class LocalParser(InvoiceParser):
+            # nothing listens on port 9 so the connection is refused
+            ALLOWED_DOMAINS = ["127.0.0.1:9"]
+
+        parser = LocalParser(url="http://127.0.0.1:9/v/?vl=1", lazy=True)
+        with pytest.raises(ParserRequestException, match="^Request failed: "):
+            parser.data()
+
+    def test_aload(self):
+        """Test that aload() uses the given async fetcher"""
+
+        fetcher = mock.Mock()
+        fetcher.fetch = mock.AsyncMock(return_value=self.example_response)
+
+        parser = InvoiceParser(url="https://suf.purs.gov.rs/v/vl?", lazy=True)
+        asyncio.run(parser.aload(fetcher))
+        asyncio.run(parser.aload(fetcher))
+
+        fetcher.fetch.assert_awaited_once_with("https://suf.purs.gov.rs/v/vl?")
+        assert parser.get_invoice_number() == "QWERTYU1-QWERTYU1-12345"
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_from_response(self, mock_get):
+        """Test that a parser can be built from already downloaded bytes"""
+
+        parser = InvoiceParser.from_response(
+            self.example_response, url="https://suf.purs.gov.rs/v/vl?"
+        )
+        assert parser.data(fields=["company_tin"]) == {"company_tin": "123456789"}
+        mock_get.assert_not_called()
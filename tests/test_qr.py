@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import struct
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase
+from urllib.parse import quote
+
+import pytest
+from helpers import read_example_response
+from pytz import utc
+
+from sr_invoice_parser.exceptions import ParserParseException
+from sr_invoice_parser.parser import InvoiceParser
+from sr_invoice_parser.qr import decode_verification_url
+
+
+def build_url(buyer_id=b"10:987654321"):
+    """Build a verification URL matching the example invoice"""
+
+    invoice_time = datetime(2024, 4, 7, 15, 0, 30, tzinfo=utc)
+    payload = (
+        struct.pack("<B8s8sIIQ", 3, b"QWERTYU1", b"QWERTYU1", 12345, 11111, 89600000)
+        + struct.pack(">Q", int(invoice_time.timestamp() * 1000))
+        + bytes([0, 0, len(buyer_id)])
+        + buyer_id
+        + b"\x01" * 256
+        + b"\x02" * 256
+    )
+    payload += hashlib.md5(payload).digest()
+    vl = base64.b64encode(payload).decode()
+    return f"https://suf.purs.gov.rs/v/?vl={quote(vl, safe='')}"
+
+
+class TestQR(TestCase):
+    def test_decode_verification_url(self):
+        """Test that the record fields are decoded from the URL"""
+
+        record = decode_verification_url(build_url())
+
+        assert record.version == 3
+        assert record.invoice_number == "QWERTYU1-QWERTYU1-12345"
+        assert record.invoice_counter == "11111/12345ПП"
+        assert record.invoice_datetime == datetime(2024, 4, 7, 15, 0, 30, tzinfo=utc)
+        assert record.buyer_id == "10:987654321"
+        assert record.get_total_amount() == 8960.0
+        assert record.get_total_amount("decimal") == Decimal("8960.00")
+        assert record.get_total_amount("para") == 896000
+        assert record.encrypted_internal_data == b"\x01" * 256
+        assert record.signature == b"\x02" * 256
+
+        # an unquoted `+` turns into a space
+        url = build_url().replace("%2B", "+")
+        assert decode_verification_url(url).invoice_number == record.invoice_number
+
+    def test_invalid(self):
+        with pytest.raises(ParserParseException, match="no 'vl' parameter"):
+            decode_verification_url("https://suf.purs.gov.rs/v/")
+        with pytest.raises(ParserParseException, match="too short"):
+            decode_verification_url("https://suf.purs.gov.rs/v/?vl=QUJD")
+
+        url = build_url()
+        index = url.index("vl=") + 10
+        url = url[:index] + ("B" if url[index] == "A" else "A") + url[index + 1 :]
+        with pytest.raises(ParserParseException, match="hash does not match"):
+            decode_verification_url(url)
+
+    def test_data_from_qr(self):
+        """Test that the QR fields match the page without fetching it"""
+
+        parser = InvoiceParser(url=build_url(), lazy=True)
+        data = parser.data(source="qr")
+
+        assert parser.html_text is None
+        page = InvoiceParser(html_text=read_example_response()).data()
+        assert data == {field: page[field] for field in InvoiceParser.QR_FIELDS}
+
+        assert parser.data(fields=["invoice_number"], source="qr") == {
+            "invoice_number": "QWERTYU1-QWERTYU1-12345"
+        }
+        with pytest.raises(ParserParseException, match="Fields not in the QR code"):
+            parser.data(fields=["company_name"], source="qr")
+        with pytest.raises(ParserParseException, match="Unknown source"):
+            parser.data(source="html")
@@ -0,0 +1,135 @@
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase, mock
+
+import pytest
+import requests
+from helpers import read_example_response
+
+from sr_invoice_parser.exceptions import ParserRequestException
+from sr_invoice_parser.metrics import Metrics
+from sr_invoice_parser.parser import InvoiceParser
+from sr_invoice_parser.scheduler import ReverificationScheduler
+
+FINAL = "Рачун је проверен"
+PROCESSING = "Рачун се обрађује"
+ETAGS = {PROCESSING: '"1"', FINAL: '"2"'}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the page with the current status, honouring `If-None-Match`"""
+
+    status = PROCESSING
+    hits = []
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        etag = ETAGS[self.status]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = read_example_response().replace(FINAL.encode(), self.status.encode())
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestReverificationScheduler(TestCase):
+    @pytest.fixture(autouse=True)
+    def start_server(self, serve):
+        self.host = serve(StubHandler).host
+
+    def setUp(self):
+        super().setUp()
+        StubHandler.status = PROCESSING
+        StubHandler.hits = []
+        self.now = 1000.0
+
+    def scheduler(self, **kwargs):
+        return ReverificationScheduler(
+            initial_delay=10,
+            jitter=0,
+            allowed_domains=[self.host],
+            clock=lambda: self.now,
+            **kwargs,
+        )
+
+    def test_get_status(self):
+        parser = InvoiceParser(html_text=read_example_response())
+        assert parser.get_status() == FINAL
+
+    def test_add_validates_domain(self):
+        with pytest.raises(ParserRequestException, match="Invalid domain"):
+            self.scheduler().add("https://example.com/v/?vl=1")
+
+    def test_status_changes(self):
+        """Test backoff, conditional requests and the change to final"""
+
+        metrics = Metrics()
+        scheduler = self.scheduler(metrics=metrics)
+        url = f"http://{self.host}/v/?vl=1"
+        scheduler.add(url)
+        scheduler.add(f"http://{self.host}/v/?vl=2", status=FINAL)
+        assert len(scheduler) == 1
+
+        [change] = scheduler.run_pending()
+        assert (change.status, change.previous, change.final) == (
+            PROCESSING,
+            None,
+            False,
+        )
+        assert scheduler.next_due == 1010.0
+
+        # nothing is due yet
+        assert scheduler.run_pending() == []
+        assert len(StubHandler.hits) == 1
+
+        self.now = 1010.0
+        assert scheduler.run_pending() == []
+        assert StubHandler.hits[-1] == ("/v/?vl=1", ETAGS[PROCESSING])
+        # unchanged checks back off exponentially
+        assert scheduler.next_due == 1030.0
+
+        StubHandler.status = FINAL
+        self.now = 1030.0
+        [change] = scheduler.run_pending()
+        assert change.final
+        assert change.previous == PROCESSING
+        assert change.data["invoice_number"] == "QWERTYU1-QWERTYU1-12345"
+        assert len(scheduler) == 0
+        assert scheduler.next_due is None
+
+        counters = metrics.to_dict()["counters"]
+        assert counters["reverification_responses"] == {
+            "status=200": 2,
+            "status=304": 1,
+        }
+
+    def test_run(self):
+        """Test that `run` sleeps until each check is due and stops when done"""
+
+        scheduler = self.scheduler(max_attempts=3)
+        scheduler.add(f"http://{self.host}/v/?vl=1")
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            self.now += seconds
+
+        changes = list(scheduler.run(sleep=sleep))
+
+        assert [change.status for change in changes] == [PROCESSING]
+        assert sleeps == [10.0, 20.0]
+        assert len(scheduler) == 0
+
+    def test_close_keeps_given_session(self):
+        session = requests.Session()
+        with mock.patch.object(session, "close") as close:
+            self.scheduler(session=session).close()
+            close.assert_not_called()
@@ -0,0 +1,197 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase, mock
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+from helpers import read_example_response
+
+from sr_invoice_parser.archive import open_archive
+from sr_invoice_parser.cache import ResponseCache
+from sr_invoice_parser.exceptions import ParserParseException
+from sr_invoice_parser.metrics import Metrics
+from sr_invoice_parser.parser import InvoiceParser
+from sr_invoice_parser.specifications import find_token, parse_specifications
+
+TOKEN = "0f9a2c7e-5d1b-4c3a-9e8f-112233445566"
+PAGE = read_example_response().replace(
+    b"</body>", f"<script>viewModel.Token('{TOKEN}');</script></body>".encode()
+)
+SPECIFICATIONS = {
+    "success": True,
+    "items": [
+        {
+            "gtin": "8600000000001",
+            "name": "Хлеб бели 500г",
+            "quantity": 2.0,
+            "total": 130.0,
+            "unitPrice": 65.0,
+            "label": "Е",
+            "labelRate": 10.0,
+            "taxBaseAmount": 118.18,
+            "vatAmount": 11.82,
+        },
+        {
+            "gtin": "8600000000002",
+            "name": "Јабука",
+            "quantity": 0.456,
+            "total": 86.64,
+            "unitPrice": 189.99,
+            "label": "Ђ",
+            "labelRate": 20.0,
+            "taxBaseAmount": 72.2,
+            "vatAmount": 14.44,
+        },
+    ],
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the page with a token and its specifications, or fails them"""
+
+    fail = False
+    requests = []
+
+    def do_GET(self):
+        self.reply(200, PAGE)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        form = parse_qs(self.rfile.read(length).decode())
+        self.requests.append((self.path, form))
+        if self.fail or form.get("token") != [TOKEN]:
+            self.reply(500, b"")
+            return
+        self.reply(200, json.dumps(SPECIFICATIONS).encode())
+
+    def reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSpecifications(TestCase):
+    @pytest.fixture(autouse=True)
+    def start_server(self, serve):
+        self.host = serve(StubHandler).host
+
+    def setUp(self):
+        super().setUp()
+        StubHandler.fail = False
+        StubHandler.requests = []
+
+    def parser(self, specifications=True, **kwargs):
+        class StubParser(InvoiceParser):
+            ALLOWED_DOMAINS = [self.host]
+
+        return StubParser(
+            url=f"http://{self.host}/v/?vl=1", specifications=specifications, **kwargs
+        )
+
+    def test_find_token(self):
+        """Test that the token is found in the page script"""
+
+        assert find_token(PAGE) == TOKEN
+        assert find_token('{"token": "abc"}') == "abc"
+        assert find_token(read_example_response()) is None
+
+    def test_parse_specifications(self):
+        """Test that the JSON is parsed into exact item amounts"""
+
+        content = json.dumps(SPECIFICATIONS)
+        items = parse_specifications(content)
+        assert items[0] == {
+            "name": "Hleb beli 500g",
+            "vat": 10,
+            "price": 65.0,
+            "quantity": 2,
+            "total_price": 130.0,
+        }
+        assert items[1]["quantity"] == 0.456
+
+        items = parse_specifications(content, "decimal")
+        assert items[1]["total_price"] == Decimal("86.64")
+        assert parse_specifications(content, "para")[1]["price"] == 18999
+
+        with pytest.raises(ParserParseException, match="not successful"):
+            parse_specifications('{"success": false}')
+
+    def test_specification_items(self):
+        """Test that items come from the endpoint with the page token"""
+
+        parser = self.parser()
+        items = parser.data()["invoice_items"]
+
+        assert [item["name"] for item in items] == ["Hleb beli 500g", "Jabuka"]
+        assert StubHandler.requests == [
+            (
+                "/specifications",
+                {"invoiceNumber": ["QWERTYU1-QWERTYU1-12345"], "token": [TOKEN]},
+            )
+        ]
+
+    def test_sessions(self):
+        """Test that a created session is closed and a given one is kept"""
+
+        parser = self.parser()
+        session = parser.session
+        with mock.patch.object(session, "close") as close:
+            parser.invoice_items
+            close.assert_called_once()
+        assert parser.session is None
+
+        session = requests.Session()
+        with session, mock.patch.object(session, "close") as close:
+            self.parser(session=session).invoice_items
+            close.assert_not_called()
+
+    def test_archive_page(self):
+        """Test that the token is found in a page read from an archive"""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pages.tar")
+            with tarfile.open(path, "w") as bundle:
+                info = tarfile.TarInfo("page.html")
+                info.size = len(PAGE)
+                bundle.addfile(info, io.BytesIO(PAGE))
+
+            with open_archive(path) as archive:
+                page = archive[0]
+                assert isinstance(page, memoryview)
+                assert find_token(page) == TOKEN
+                items = self.parser(html_text=page).invoice_items
+                del page
+
+        assert [item["name"] for item in items] == ["Hleb beli 500g", "Jabuka"]
+        assert len(StubHandler.requests) == 1
+
+    def test_cached_journal_items(self):
+        """Test that results cached without specifications are not reused"""
+
+        cache = ResponseCache()
+        parser = self.parser(specifications=False, cache=cache)
+        assert len(parser.data()["invoice_items"]) == 5
+
+        items = self.parser(cache=cache).data()["invoice_items"]
+        assert [item["name"] for item in items] == ["Hleb beli 500g", "Jabuka"]
+
+    def test_fallback_to_journal(self):
+        """Test that a failed specifications request falls back to the journal"""
+
+        StubHandler.fail = True
+        metrics = Metrics()
+        parser = self.parser(metrics=metrics)
+
+        assert parser.invoice_items == parser.get_items()
+        assert len(parser.invoice_items) == 5
+        assert metrics.to_dict()["counters"]["specifications_fallbacks"] == {"": 1}
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import sr_invoice_parser
+from benchmarks.startup import HEAVY_MODULES, parse_importtime
+
+
+class TestStartup(TestCase):
+    def test_heavy_dependencies_are_lazy(self):
+        """Test that importing the package and the parser loads no heavy dependency"""
+
+        code = (
+            "import sys\n"
+            "import sr_invoice_parser\n"
+            "from sr_invoice_parser import InvoiceParser, ParserParseException\n"
+            "print(' '.join(sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        loaded = set(output.split())
+
+        assert [name for name in HEAVY_MODULES if name in loaded] == []
+        assert "sr_invoice_parser.parser" in loaded
+        assert "sr_invoice_parser.batch" not in loaded
+
+    def test_lazy_exports(self):
+        assert "parse_many" in dir(sr_invoice_parser)
+        assert sr_invoice_parser.parse_many.__module__ == "sr_invoice_parser.batch"
+        for name in sr_invoice_parser.__all__:
+            assert getattr(sr_invoice_parser, name) is not None
+        with self.assertRaises(AttributeError):
+            sr_invoice_parser.missing
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   sr_invoice_parser.exceptions\n"
+            "import time:       800 |        920 | sr_invoice_parser\n"
+        )
+        assert parse_importtime(output) == [
+            ("sr_invoice_parser.exceptions", 120, 120, 1),
+            ("sr_invoice_parser", 800, 920, 0),
+        ]
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase, mock
+
+from helpers import read_example_response
+from pytz import utc
+
+from sr_invoice_parser.parser import InvoiceParser
+from sr_invoice_parser.store import ResultStore
+
+URL = "https://suf.purs.gov.rs/v/?vl=QUJD"
+
+
+class TestResultStore(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.example_response = read_example_response()
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.directory.name, "invoices.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+        super().tearDown()
+
+    def test_put_and_get(self):
+        data = InvoiceParser(html_text=self.example_response).data()
+        self.store.put(data, url=URL)
+
+        assert self.store.get("QWERTYU1-QWERTYU1-12345") == data
+        assert self.store.get_by_url(URL + "&lang=en") == data
+        assert self.store.get("missing") is None
+        assert "QWERTYU1-QWERTYU1-12345" in self.store
+        assert self.store.get("QWERTYU1-QWERTYU1-12345")[
+            "invoice_datetime"
+        ] == datetime(2024, 4, 7, 15, 0, 30).replace(tzinfo=utc)
+
+    def test_get_many_and_compact(self):
+        self.store.put_many(
+            ({"invoice_number": str(number)}, None) for number in range(1200)
+        )
+        found = self.store.get_many(["5", "1199", "missing"])
+
+        assert found == {
+            "5": {"invoice_number": "5"},
+            "1199": {"invoice_number": "1199"},
+        }
+
+        self.store.delete("5")
+        self.store.compact()
+        assert len(self.store) == 1199
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_parser_skips_known_invoices(self, mock_get):
+        """Test that known invoices are not fetched again"""
+
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.text = self.example_response
+        mock_get.return_value = mock_response
+
+        expected = InvoiceParser(url=URL, store=self.store).data()
+        mock_get.assert_called_once()
+
+        parser = InvoiceParser(url=URL, store=self.store)
+        assert parser.data() == expected
+        mock_get.assert_called_once()
+
+    @mock.patch("sr_invoice_parser.parser.requests.get")
+    def test_amount_types(self, mock_get):
+        """Test that stored amounts keep their type and other types re-parse"""
+
+        mock_response = mock.Mock()
+        mock_response.status_code = 200
+        mock_response.text = self.example_response
+        mock_get.return_value = mock_response
+
+        expected = InvoiceParser(url=URL, store=self.store, amount_type="decimal")
+        expected = expected.data()
+        data = InvoiceParser(url=URL, store=self.store, amount_type="decimal").data()
+        assert data == expected
+        assert isinstance(data["invoice_total_amount"], Decimal)
+        assert isinstance(data["invoice_items"][0]["price"], Decimal)
+        mock_get.assert_called_once()
+
+        data = InvoiceParser(url=URL, store=self.store, amount_type="para").data()
+        assert data["invoice_total_amount"] == 896000
+        assert mock_get.call_count == 2